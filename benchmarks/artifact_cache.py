@@ -0,0 +1,161 @@
+"""
+Checks the http artifact cache against a local stand-in server: a miss, storing
+and restoring the bin folder of a project, a server error and an unreachable
+server. Prints how long the round trip of the artifact took.
+
+Exits with an error if a check fails, so it can run as part of test.sh. Example:
+    python benchmarks/artifact_cache.py --size 4096
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from six.moves.BaseHTTPServer import (
+    BaseHTTPRequestHandler,
+    HTTPServer
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from wqt.utils import artifacts  # noqa: E402
+
+
+class StandIn(BaseHTTPRequestHandler):
+    """answers GET and PUT of <url>/<key>.tar.gz from memory like an artifact server, /error/ paths fail"""
+
+    files = {}
+
+    def do_GET(self):
+        if self.path.startswith('/error/'):
+            self.send_response(500)
+            self.end_headers()
+            return
+
+        if self.path not in self.files:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        data = self.files[self.path]
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_PUT(self):
+        self.files[self.path] = self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(201)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def write_project(path, size):
+    """writes a project folder with an executable and a library of size kilobytes in bin"""
+
+    os.makedirs(path + '/bin/lib')
+
+    with open(path + '/properties.ini', 'w') as f:
+        f.write('[project]\nname = artifacts\n')
+
+    with open(path + '/bin/app', 'wb') as f:
+        f.write(os.urandom(size * 1024))
+
+    with open(path + '/bin/lib/libcore.so', 'wb') as f:
+        f.write(b'core')
+
+
+def read_files(path):
+    """returns the relative paths and contents of the files in a folder"""
+
+    files = {}
+
+    for root, _, names in os.walk(path):
+        for name in names:
+            with open(os.path.join(root, name), 'rb') as f:
+                files[os.path.relpath(os.path.join(root, name), path)] = f.read()
+
+    return files
+
+
+def check(name, passed):
+    print('{:<28} {}'.format(name, 'ok' if passed else 'FAILED'))
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the http artifact cache against a local stand-in server')
+    parser.add_argument('--size', type=int, default=1024, help='kilobytes of the executable in the artifact')
+    options = parser.parse_args()
+
+    server = HTTPServer(('127.0.0.1', 0), StandIn)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    url = 'http://127.0.0.1:' + str(server.server_address[1])
+    work = tempfile.mkdtemp(prefix='wqt-artifacts-')
+    passed = True
+
+    try:
+        project = work + '/project'
+        archive = work + '/artifact.tar.gz'
+        write_project(project, options.size)
+        expected = read_files(project + '/bin')
+        cache = artifacts.HttpCache(url)
+
+        passed &= check('miss', not cache.get('missing', archive))
+        passed &= check('restore of a miss', not artifacts.restore(cache, 'key', project))
+
+        start = time.time()
+        artifacts.store(cache, 'key', project)
+        stored = time.time() - start
+        passed &= check('store', '/key.tar.gz' in StandIn.files)
+
+        shutil.rmtree(project + '/bin')
+        os.makedirs(project + '/bin')
+
+        with open(project + '/bin/stale', 'w') as f:
+            f.write('left from another build')
+
+        start = time.time()
+        restored = artifacts.restore(cache, 'key', project)
+        restore_time = time.time() - start
+        passed &= check('restore', restored and read_files(project + '/bin') == expected)
+
+        # builds go on without the cache when it fails, the errors it raises have to be the ones handle catches
+        try:
+            artifacts.HttpCache(url + '/error').get('key', archive)
+            passed &= check('server error', False)
+        except artifacts.CACHE_ERRORS:
+            passed &= check('server error', True)
+
+        server.shutdown()
+        server.server_close()
+
+        try:
+            cache.get('key', archive)
+            passed &= check('unreachable server', False)
+        except artifacts.CACHE_ERRORS:
+            passed &= check('unreachable server', True)
+
+        print('store:   {:.3f}s'.format(stored))
+        print('restore: {:.3f}s'.format(restore_time))
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+
+    if not passed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+"""
+Compares clean build times of the bundled widgets and quick templates with
+precompiled headers and unity builds turned on and off.
+
+Needs Qt, cmake and a compiler. Example:
+    python benchmarks/build_modes.py --classes 100 --output build_modes.json
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODES = {
+    'default': {'pch': 'false', 'unity': 'false'},
+    'pch': {'pch': 'true', 'unity': 'false'},
+    'unity': {'pch': 'false', 'unity': 'true'},
+    'pch+unity': {'pch': 'true', 'unity': 'true'},
+}
+
+HEADER = """#pragma once
+
+#include <QObject>
+#include <QString>
+
+class Class{n} : public QObject {{
+    Q_OBJECT
+
+public:
+    explicit Class{n}(QObject *parent = nullptr);
+    QString name() const;
+
+signals:
+    void changed();
+}};
+"""
+
+SOURCE = """#include "class{n}.h"
+
+#include <QVector>
+
+Class{n}::Class{n}(QObject *parent) : QObject(parent) {{}}
+
+QString Class{n}::name() const {{
+    QVector<int> values({n} + 1, {n});
+    return QString::number(values.size());
+}}
+"""
+
+
+def wqt(path, *args):
+    """runs wqt from this checkout on the project at path"""
+
+    env = dict(os.environ)
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+
+    with open(os.devnull, 'w') as devnull:
+        return subprocess.call([sys.executable, '-m', 'wqt.wqt'] + list(args) + ['--path', path],
+                               stdout=devnull, stderr=devnull, env=env)
+
+
+def set_build_options(path, options, batch):
+    """rewrites the build section of the project's properties.ini"""
+
+    with open(path + '/properties.ini') as f:
+        lines = f.read().split('\n')
+
+    values = dict(options, unity_batch=str(batch))
+
+    for i, line in enumerate(lines):
+        key = line.split('=')[0].split(':')[0].strip()
+
+        if key in values:
+            lines[i] = key + ' = ' + values[key]
+
+    with open(path + '/properties.ini', 'w') as f:
+        f.write('\n'.join(lines))
+
+
+def create_project(root, qt_type, classes):
+    """creates a project from the bundled template with extra QObject classes"""
+
+    path = os.path.join(root, qt_type + '_bench')
+    os.mkdir(path)
+
+    if wqt(path, 'create', qt_type) != 0:
+        raise RuntimeError('wqt create ' + qt_type + ' failed')
+
+    src = os.path.join(path, 'src', os.path.basename(path))
+
+    for n in range(classes):
+        with open(os.path.join(src, 'class' + str(n) + '.h'), 'w') as f:
+            f.write(HEADER.format(n=n))
+        with open(os.path.join(src, 'class' + str(n) + '.cpp'), 'w') as f:
+            f.write(SOURCE.format(n=n))
+
+    return path
+
+
+def time_clean_build(path, jobs):
+    """returns the wall time of a build from an empty build folder"""
+
+    shutil.rmtree(os.path.join(path, 'wqt', 'build'), ignore_errors=True)
+
+    start = time.time()
+    code = wqt(path, 'build', '--jobs', str(jobs))
+    elapsed = time.time() - start
+
+    if code != 0:
+        raise RuntimeError('wqt build failed for ' + path)
+
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark clean builds with pch and unity build modes')
+    parser.add_argument('--types', nargs='+', default=['widgets', 'quick'], help='application types to build')
+    parser.add_argument('--classes', type=int, default=50, help='extra QObject classes added to each project')
+    parser.add_argument('--batch', type=int, default=8, help='unity build batch size')
+    parser.add_argument('--jobs', type=int, default=1, help='parallel build jobs')
+    parser.add_argument('--repeat', type=int, default=1, help='builds per mode, the fastest is kept')
+    parser.add_argument('--output', help='file to write the json results to')
+    options = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='wqt-bench-')
+    results = []
+
+    try:
+        for qt_type in options.types:
+            path = create_project(root, qt_type, options.classes)
+
+            for mode in sorted(MODES):
+                set_build_options(path, MODES[mode], options.batch)
+                elapsed = min(time_clean_build(path, options.jobs) for _ in range(options.repeat))
+                results.append({'type': qt_type, 'mode': mode, 'classes': options.classes,
+                                'jobs': options.jobs, 'seconds': round(elapsed, 3)})
+                print('{:<8} {:<10} {:8.2f}s'.format(qt_type, mode, elapsed))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
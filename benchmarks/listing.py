@@ -0,0 +1,122 @@
+"""
+Compares the directory listing helpers of wqt.utils.helper with the
+os.listdir/os.walk versions they replaced on a synthetic tree.
+
+The tree has --files files spread over folders of --per-dir files and is
+created in a temporary folder that is removed afterwards. Example:
+    python benchmarks/listing.py --files 50000 --repeat 5
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from wqt.utils import helper  # noqa: E402
+
+
+def old_get_files_recursively(directory):
+    arr = []
+    for root, dirs, files in os.walk(directory):
+        for file in files:
+            arr.append(helper.linux_path(root + '/' + file))
+
+    return arr
+
+
+def old_get_dirs_recursively(path):
+    return [helper.linux_path(root) for root, dirs, files in os.walk(path)]
+
+
+def old_get_files(path):
+    return [helper.linux_path(path + '/' + file) for file in os.listdir(path)
+            if not os.path.isdir(path + '/' + file)]
+
+
+def create_tree(path, files, per_dir):
+    """creates folders of per_dir files, ten folders per parent folder"""
+
+    folders = max(1, files // per_dir)
+
+    for index in range(folders):
+        folder = path + '/' + '/'.join('d' + digit for digit in str(index).zfill(len(str(folders))))
+
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+
+        for number in range(min(per_dir, files - index * per_dir)):
+            open(folder + '/f' + str(number) + '.cpp', 'w').close()
+
+    # listings of folders changed in the last seconds are not kept, the tree has to settle first
+    time.sleep(helper.RACY_TIME + 0.1)
+
+
+def measure(func, repeat):
+    """returns the best time of running func repeat times"""
+
+    best = None
+
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the directory listing helpers')
+    parser.add_argument('--files', type=int, default=50000, help='files in the synthetic tree')
+    parser.add_argument('--per-dir', type=int, default=100, help='files per folder')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per measurement')
+    options = parser.parse_args()
+
+    path = helper.linux_path(tempfile.mkdtemp(prefix='wqt-listing-'))
+
+    try:
+        create_tree(path, options.files, options.per_dir)
+
+        def new_files():
+            helper.get_files_recursively(path)
+
+        def new_dirs():
+            helper.get_dirs_recursively(path)
+
+        def new_top():
+            for _ in range(100):
+                helper.get_files(path)
+
+        def old_top():
+            for _ in range(100):
+                old_get_files(path)
+
+        helper.Scope.listings = {}
+        start = time.time()
+        helper.get_files_recursively(path)
+        cold = time.time() - start
+
+        assert old_get_files_recursively(path) == helper.get_files_recursively(path)
+        assert old_get_dirs_recursively(path) == helper.get_dirs_recursively(path)
+
+        print('{} files in {} folders'.format(options.files, len(old_get_dirs_recursively(path))))
+        print('get_files_recursively   old {:.4f}s  cold {:.4f}s  warm {:.4f}s'.format(
+            measure(lambda: old_get_files_recursively(path), options.repeat), cold,
+            measure(new_files, options.repeat)))
+        print('get_dirs_recursively    old {:.4f}s  warm {:.4f}s'.format(
+            measure(lambda: old_get_dirs_recursively(path), options.repeat), measure(new_dirs, options.repeat)))
+        print('get_files x100          old {:.4f}s  warm {:.4f}s'.format(
+            measure(old_top, options.repeat), measure(new_top, options.repeat)))
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+Measures how long wqt takes to start for commands that do not build anything
+and checks that they do not import the heavy command modules.
+
+Exits with an error if wqt's overhead over a bare python start is above the
+budget, so it can run as part of test.sh. Example:
+    python benchmarks/startup.py --runs 20 --budget 0.15
+"""
+
+from __future__ import print_function
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules only the commands that create, update or build a project need
+HEAVY_MODULES = [
+    'pystache',
+    'wqt.command.creation',
+    'wqt.command.watch',
+    'wqt.templates.operations',
+]
+
+
+def environment():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    return env
+
+
+def median_time(command, runs):
+    """returns the median wall time of running the command"""
+
+    times = []
+
+    with open(os.devnull, 'w') as devnull:
+        for _ in range(runs):
+            start = time.time()
+            subprocess.call(command, stdout=devnull, stderr=devnull, env=environment())
+            times.append(time.time() - start)
+
+    times.sort()
+    return times[len(times) // 2]
+
+
+def imported_modules(command):
+    """returns the modules imported by the command, using python -X importtime"""
+
+    with open(os.devnull, 'w') as devnull:
+        process = subprocess.Popen([sys.executable, '-X', 'importtime'] + command, stdout=devnull,
+                                   stderr=subprocess.PIPE, env=environment())
+        _, err = process.communicate()
+
+    modules = set()
+
+    for line in err.decode('utf-8', 'replace').splitlines():
+        if line.startswith('import time:') and '|' in line:
+            modules.add(line.rsplit('|', 1)[1].strip())
+
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark wqt startup time')
+    parser.add_argument('--runs', type=int, default=10, help='runs per measurement')
+    parser.add_argument('--budget', type=float, help='maximum seconds of overhead over a bare python start')
+    options = parser.parse_args()
+
+    command = ['-m', 'wqt.wqt', 'list-types']
+    failed = False
+
+    python = median_time([sys.executable, '-c', 'pass'], options.runs)
+    wqt = median_time([sys.executable] + command, options.runs)
+    overhead = wqt - python
+
+    print('python startup:   {:.3f}s'.format(python))
+    print('wqt list-types:   {:.3f}s'.format(wqt))
+    print('wqt overhead:     {:.3f}s'.format(overhead))
+
+    if options.budget is not None and overhead > options.budget:
+        print('wqt startup overhead is over the budget of {:.3f}s'.format(options.budget))
+        failed = True
+
+    if sys.version_info >= (3, 7):
+        heavy = sorted(set(HEAVY_MODULES) & imported_modules(command))
+
+        if heavy:
+            print('list-types imports modules it does not need: ' + ', '.join(heavy))
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
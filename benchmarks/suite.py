@@ -0,0 +1,268 @@
+"""
+Times the wqt commands on synthetic projects generated from the bundled
+templates: create, no-op update, cold build, no-op build and a rebuild after
+touching one source file.
+
+Projects get --classes extra QObject classes and, for quick projects, --qml
+qml files spread over a resource tree --depth folders deep. With --stub, cmake
+and the build tool are replaced by scripts that do no work, so only wqt's own
+overhead is measured and no Qt install is needed.
+
+Results are written as json and can be compared with an earlier run, exiting
+with an error if a step got slower than the threshold. Example:
+    python benchmarks/suite.py --stub --classes 500 --qml 2000 --output new.json --compare old.json
+"""
+
+from __future__ import print_function
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from build_modes import (
+    HEADER,
+    SOURCE,
+    wqt
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from wqt import __version__  # noqa: E402
+
+STEPS = ['create', 'update', 'noop update', 'cold build', 'noop build', 'touch build']
+
+# writes the cache wqt reads the generator from and remembers the project folder and the build program,
+# cmake --build runs that build program in the build folder
+STUB_CMAKE = """import os
+import re
+import subprocess
+import sys
+
+args = sys.argv[1:]
+
+if args[0] == '--build':
+    os.chdir(args[1])
+
+    with open('CMakeCache.txt') as f:
+        program = re.search(r'CMAKE_MAKE_PROGRAM:FILEPATH=(.*)', f.read()).group(1)
+
+    sys.exit(subprocess.call([program]))
+
+generator = args[args.index('-G') + 1]
+program = [arg.split('=', 1)[1] for arg in args if arg.startswith('-DCMAKE_MAKE_PROGRAM=')][0]
+
+with open('CMakeCache.txt', 'w') as f:
+    f.write('CMAKE_GENERATOR:INTERNAL=' + generator + '\\n')
+    f.write('CMAKE_HOME_DIRECTORY:INTERNAL=' + args[-1] + '\\n')
+    f.write('CMAKE_MAKE_PROGRAM:FILEPATH=' + program + '\\n')
+
+print('-- Configuring done')
+"""
+
+# prints the progress lines ninja would for every source in the manifest without compiling anything
+STUB_NINJA = """import re
+
+with open('CMakeCache.txt') as f:
+    home = re.search(r'CMAKE_HOME_DIRECTORY:INTERNAL=(.*)', f.read()).group(1)
+
+with open(home + '/wqt/sources.cmake') as f:
+    sources = [line.strip().strip('"') for line in f if line.strip().startswith('"')]
+
+for n, source in enumerate(sources):
+    print('[' + str(n + 1) + '/' + str(len(sources)) + '] Building CXX object ' + source + '.o')
+"""
+
+QML = """import QtQuick 2.0
+
+Item {{
+    objectName: "item{n}"
+}}
+"""
+
+
+def create_stub_tools(root):
+    """writes the stub cmake and ninja, returns their paths"""
+
+    paths = []
+
+    for name, code in [('cmake', STUB_CMAKE), ('ninja', STUB_NINJA)]:
+        script = os.path.join(root, name + '.py')
+
+        with open(script, 'w') as f:
+            f.write(code)
+
+        if os.name == 'nt':
+            tool = os.path.join(root, name + '.cmd')
+
+            with open(tool, 'w') as f:
+                f.write('@"' + sys.executable + '" "' + script + '" %*\n')
+        else:
+            tool = os.path.join(root, name)
+
+            with open(tool, 'w') as f:
+                f.write('#!' + sys.executable + '\n' + code)
+
+            os.chmod(tool, 0o755)
+
+        paths.append(tool)
+
+    return paths
+
+
+def add_sources(path, classes, qml, depth):
+    """adds the classes to the project sources and the qml files to a resource tree of the given depth"""
+
+    src = os.path.join(path, 'src', os.path.basename(path))
+
+    for n in range(classes):
+        with open(os.path.join(src, 'class' + str(n) + '.h'), 'w') as f:
+            f.write(HEADER.format(n=n))
+        with open(os.path.join(src, 'class' + str(n) + '.cpp'), 'w') as f:
+            f.write(SOURCE.format(n=n))
+
+    if not os.path.exists(os.path.join(path, 'res', 'qml')):
+        return
+
+    for n in range(qml):
+        folder = os.path.join(path, 'res', 'qml', *['level' + str(level) for level in range(n % (depth + 1))])
+
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+
+        with open(os.path.join(folder, 'Item' + str(n) + '.qml'), 'w') as f:
+            f.write(QML.format(n=n))
+
+
+def timed(path, *args):
+    """returns the wall time of a wqt command, errors if it fails"""
+
+    start = time.time()
+    code = wqt(path, *args)
+    elapsed = time.time() - start
+
+    if code != 0:
+        raise RuntimeError('wqt ' + ' '.join(args) + ' failed for ' + path)
+
+    return elapsed
+
+
+def measure(root, qt_type, options, tools):
+    """runs every step once on a new project, returns the seconds of each step"""
+
+    path = os.path.join(root, qt_type + '_suite')
+    os.mkdir(path)
+
+    build = ['build', '--jobs', str(options.jobs)] + tools
+    times = {'create': timed(path, 'create', qt_type)}
+
+    add_sources(path, options.classes, options.qml, options.depth)
+
+    # the first update picks up the new files, the second one has nothing to do
+    times['update'] = timed(path, 'update')
+    times['noop update'] = timed(path, 'update')
+
+    shutil.rmtree(os.path.join(path, 'wqt', 'build'), ignore_errors=True)
+    times['cold build'] = timed(path, *build)
+    times['noop build'] = timed(path, *build)
+
+    main = os.path.join(path, 'src', qt_type + '_suite', 'main.cpp')
+
+    with open(main, 'a') as f:
+        f.write('\n')
+
+    times['touch build'] = timed(path, *build)
+
+    shutil.rmtree(path)
+
+    return times
+
+
+def compare(results, baseline_file, threshold):
+    """prints the change of every step against the baseline, returns False if a step is slower than the threshold"""
+
+    with open(baseline_file) as f:
+        baseline = dict(((item['type'], item['step']), item['seconds']) for item in json.load(f)['results'])
+
+    passed = True
+
+    print('')
+    print('compared with ' + baseline_file)
+
+    for item in results:
+        old = baseline.get((item['type'], item['step']))
+
+        if not old:
+            continue
+
+        change = (item['seconds'] - old) / old * 100
+        slower = change > threshold
+
+        print('{:<8} {:<12} {:8.3f}s -> {:8.3f}s {:+7.1f}%{}'.format(item['type'], item['step'], old,
+                                                                     item['seconds'], change,
+                                                                     '  slower' if slower else ''))
+        passed = passed and not slower
+
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark wqt commands on synthetic projects')
+    parser.add_argument('--types', nargs='+', default=['widgets', 'quick', 'console'], help='application types')
+    parser.add_argument('--classes', type=int, default=100, help='extra QObject classes added to each project')
+    parser.add_argument('--qml', type=int, default=200, help='extra qml files added to quick projects')
+    parser.add_argument('--depth', type=int, default=4, help='depth of the qml resource tree')
+    parser.add_argument('--jobs', type=int, default=1, help='parallel build jobs')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per type, the fastest time of each step is kept')
+    parser.add_argument('--stub', action='store_true', help='replace cmake and the build tool to time wqt alone')
+    parser.add_argument('--output', help='file to write the json results to')
+    parser.add_argument('--compare', help='json results of an earlier run to compare with')
+    parser.add_argument('--threshold', type=float, default=20, help='percent a step may get slower in --compare')
+    options = parser.parse_args()
+
+    root = tempfile.mkdtemp(prefix='wqt-suite-')
+    results = []
+
+    try:
+        tools = []
+
+        if options.stub:
+            cmake, ninja = create_stub_tools(root)
+            tools = ['--cmake', cmake, '--make', ninja]
+
+        for qt_type in options.types:
+            runs = [measure(root, qt_type, options, tools) for _ in range(options.repeat)]
+
+            for step in STEPS:
+                seconds = min(run[step] for run in runs)
+                results.append({'type': qt_type, 'step': step, 'seconds': round(seconds, 4)})
+                print('{:<8} {:<12} {:8.3f}s'.format(qt_type, step, seconds))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    report = {
+        'version': __version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'time': time.time(),
+        'stub': options.stub,
+        'options': {'classes': options.classes, 'qml': options.qml, 'depth': options.depth, 'jobs': options.jobs,
+                    'repeat': options.repeat},
+        'results': results
+    }
+
+    if options.output:
+        with open(options.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if options.compare and not compare(results, options.compare, options.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -7,8 +7,7 @@ from setuptools import find_packages, setup
 install_requires = [
     'colorama',
     'six',
-    'pystache',
-    'xmltodict'
+    'pystache'
 ]
 
 
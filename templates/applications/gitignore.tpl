@@ -69,6 +69,11 @@ CMakeLists.txt.user*
 # bin and build folder
 bin
 wqt/build
+wqt/state.json
+wqt/sources.cmake
+wqt/profile.json
+wqt/trace.json
+wqt/logs
 
 # mac files
 # General
@@ -3,6 +3,15 @@
 # install wcosa
 python setup.py -q install
 
+# startup time budget for commands that do not build
+python benchmarks/startup.py --budget 0.25 || exit 1
+
+# wqt overhead of every command on small synthetic projects, no Qt needed
+python benchmarks/suite.py --stub --repeat 1 --classes 20 --qml 20 || exit 1
+
+# http artifact cache against a local stand-in server
+python benchmarks/artifact_cache.py || exit 1
+
 # Test Case 1
 rm -rf test-wqt
 mkdir test-wqt
@@ -1,10 +1,17 @@
 function(add_sources rel_path group_name list_src)
   message(STATUS "   > ${rel_path} >> ${group_name}")
-   include_directories(${rel_path})
-  file(GLOB_RECURSE list_globbed "${rel_path}/*.h" "${rel_path}/*.cpp" "${rel_path}/*.cxx" "${rel_path}/*.hpp")
-  foreach(file ${list_globbed})
-    message(STATUS "     - ${file}")
-  endforeach()
+  include_directories(${rel_path})
+  # wqt update lists the sources in wqt/sources.cmake, globbing is only a fallback without it
+  file(RELATIVE_PATH manifest_key ${ROOT_DIR} ${rel_path})
+  if(DEFINED WQT_SOURCES_${manifest_key})
+    set(list_globbed ${WQT_SOURCES_${manifest_key}})
+  else()
+    file(GLOB_RECURSE list_globbed "${rel_path}/*.h" "${rel_path}/*.cpp" "${rel_path}/*.cxx" "${rel_path}/*.hpp")
+  endif()
+  # sources wqt update found no Qt meta-object macros in are not scanned by AUTOMOC
+  if(DEFINED WQT_SKIP_AUTOMOC_${manifest_key})
+    set_source_files_properties(${WQT_SKIP_AUTOMOC_${manifest_key}} PROPERTIES SKIP_AUTOMOC ON)
+  endif()
   set(list_return ${list_globbed} ${${list_src}})
   set(${list_src} ${list_return} PARENT_SCOPE)
   source_group(${group_name} FILES ${list_globbed})
@@ -0,0 +1,215 @@
+"""@package wqt
+Api runs the wqt commands inside the calling process
+
+Failures raise the errors of wqt.utils.errors instead of exiting, the working directory is never changed and every
+command returns a Result with its timings and the files it produced. Output is written like the command line
+writes it, set_output_mode('quiet') turns it off, the output of the tools is always saved in wqt/logs.
+"""
+
+import time
+
+# the errors and output modes are part of the api, callers import them from here
+from wqt.utils.errors import (  # noqa: F401
+    BuildError,
+    ConfigureError,
+    ProjectError,
+    TestError,
+    ToolError,
+    WQtError
+)
+from wqt.utils.helper import (
+    get_build_configs,
+    get_valid_path
+)
+from wqt.utils.output import (  # noqa: F401
+    OUTPUT_MODES,
+    add_listener,
+    error,
+    remove_listener,
+    set_output_mode
+)
+
+
+class Result:
+    """what a command did
+
+    duration is the seconds the command took, timings the seconds of each phase (update, configure, compile, test)
+    with the configuration appended, artifacts the files the command produced and events the build events it emitted
+    """
+
+    def __init__(self, action, path):
+        self.action = action
+        self.path = path
+        self.duration = 0.0
+        self.timings = {}
+        self.artifacts = []
+        self.events = []
+        self.changed = False
+        self.code = None
+        self.tests = []
+
+    def record(self, event):
+        """keeps a build event and adds the duration of finished phases to the timings"""
+
+        self.events.append(event)
+
+        if event['event'] == 'phase_end':
+            name = event['phase'] + ('-' + event['config'] if event.get('config') else '')
+            self.timings[name] = self.timings.get(name, 0.0) + event['duration']
+
+    def __repr__(self):
+        return '<Result ' + self.action + ' ' + self.path + ' {:.3f}s>'.format(self.duration)
+
+
+def __run(action, path, command):
+    """runs command(path, result) and returns the result, errors get the result so far as their result attribute"""
+
+    result = Result(action, path)
+    start = time.time()
+    add_listener(result.record)
+
+    try:
+        result.path = get_valid_path(path)
+        command(result.path, result)
+    except WQtError as e:
+        e.result = result
+        raise
+    finally:
+        remove_listener(result.record)
+        result.duration = time.time() - start
+
+    return result
+
+
+def __add_executables(path, result, config):
+    """adds the executables of the built configurations to the artifacts"""
+
+    from wqt.command.handle import get_executable_command
+
+    for build_config in get_build_configs(config):
+        command = get_executable_command(path, False, build_config)
+
+        if command is not None:
+            result.artifacts.append(command[0])
+
+
+def create(path, qt_type):
+    """creates a project of the Qt application type (widgets, quick or console) in the existing folder path"""
+
+    def command(path, result):
+        from wqt.command import creation
+        from wqt.templates.files import QType
+
+        if QType.get_type(qt_type) is None:
+            error('Invalid Qt application specified', ProjectError)
+
+        creation.create(path, QType.get_type(qt_type))
+        result.changed = True
+        result.artifacts = [path + '/properties.ini', path + '/CMakeLists.txt']
+
+    return __run('create', path, command)
+
+
+def update(path):
+    """updates the generated files of the project, result.changed tells if any of them changed"""
+
+    def command(path, result):
+        from wqt.command import creation
+
+        result.changed = creation.update(path)
+        result.artifacts = [path + '/CMakeLists.txt']
+
+    return __run('update', path, command)
+
+
+def configure(path, generator=None, make=None, cmake=None, config=None):
+    """updates the project and runs cmake in the build folder of config (debug, release, relwithdebinfo or all)"""
+
+    def command(path, result):
+        from wqt.command import handle
+
+        handle.configure(path, generator, make, cmake, config=config)
+
+    return __run('configure', path, command)
+
+
+def build(path, generator=None, make=None, cmake=None, jobs=None, job_memory=None, no_configure=False, config=None):
+    """updates, configures and builds the project, the artifacts are the executables that were built"""
+
+    def command(path, result):
+        from wqt.command import handle
+
+        handle.build(path, generator, make, cmake, jobs, job_memory, no_configure=no_configure, config=config)
+        __add_executables(path, result, config)
+
+    return __run('build', path, command)
+
+
+def build_all(path, generator=None, make=None, cmake=None, jobs=None, job_memory=None, no_configure=False,
+              config=None):
+    """builds every project of the workspace path is in, each project is built by its own wqt process"""
+
+    def command(path, result):
+        from wqt.command import workspace
+
+        workspace.build_all(path, generator, make, cmake, jobs, job_memory, no_configure, config)
+
+    return __run('build', path, command)
+
+
+def clean(path, objects=False, config=None):
+    """removes the build files of the project, only the object files if objects is True"""
+
+    def command(path, result):
+        from wqt.command import handle
+
+        handle.clean(path, objects, config)
+
+    return __run('clean', path, command)
+
+
+def run(path, generator=None, make=None, cmake=None, jobs=None, job_memory=None, config=None):
+    """builds the project and runs its executable until it exits, result.code is its exit code"""
+
+    def command(path, result):
+        from wqt.command import handle
+
+        result.code = handle.run(path, generator, make, cmake, jobs, job_memory, config)
+        __add_executables(path, result, config)
+
+    return __run('run', path, command)
+
+
+def open(path, config=None):
+    """runs the executable the project was built into until it exits, result.code is its exit code"""
+
+    def command(path, result):
+        from wqt.command import handle
+
+        result.code = handle.open(path, config)
+        __add_executables(path, result, config)
+
+    return __run('open', path, command)
+
+
+def test(path, generator=None, make=None, cmake=None, jobs=None, job_memory=None, no_configure=False, config=None,
+         shard=None, report=None):
+    """builds the project and runs its tests, result.tests has the result of every test that ran
+
+    failing tests raise TestError, its results attribute has the result of every test
+    """
+
+    def command(path, result):
+        from wqt.command import testing
+
+        try:
+            result.tests = testing.test(path, generator, make, cmake, jobs, job_memory, no_configure, config, shard,
+                                        report)
+        except TestError as e:
+            result.tests = e.results
+            raise
+        finally:
+            if report and result.tests:
+                result.artifacts.append(report)
+
+    return __run('test', path, command)
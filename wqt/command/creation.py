@@ -13,17 +13,21 @@ from wqt.templates.operations import (
     copy_application_files,
     copy_other_files,
     verify_project_structure,
-    update_qml_resources
+    update_qml_resources,
+    update_sources_manifest
 )
 from wqt.toolchain.operations import (
     copy_toolchain_files
 )
+from wqt.utils.errors import ProjectError
 from wqt.utils.helper import (
     any_folders_exist,
     get_files,
     get_dirs,
     get_valid_path,
 )
+from wqt.utils.profile import profiled
+from wqt.utils.state import get_state
 from wqt.utils.output import (
     writeln,
     write,
@@ -39,7 +43,7 @@ def create(path, application):
     # check if there are files in the folder
     if get_dirs(path) or get_files(path):
         if any_folders_exist(path + '/src', path + '/lib', path + '/res'):
-            error('There is already a src/lib/res folder in this directory. Use wqt update instead')
+            error('There is already a src/lib/res folder in this directory. Use wqt update instead', ProjectError)
 
     writeln('Creating Qt ' + application + ' project', color=Fore.YELLOW)
     write('Copying required files and applying configuration - ', color=Fore.CYAN)
@@ -48,30 +52,45 @@ def create(path, application):
     fill_and_copy_config(application, path)
     parse_and_copy_cmake(application, path)
     copy_application_files(application, path)
+    update_sources_manifest(path)
     copy_toolchain_files(path)
     copy_other_files(path)
+    get_state(path).save()
 
     writeln('done')
     writeln('Qt project created', color=Fore.YELLOW)
 
 
+@profiled
 def update(path):
-    """Updates existing WQt project"""
+    """Updates existing WQt project, returns True if any generated file changed"""
 
     path = get_valid_path(path)
     qt_type = get_qt_type(path)
 
     if qt_type is None:
-        error('Cannot determine project Qt type, recreate the project!')
+        error('Cannot determine project Qt type, recreate the project!', ProjectError)
 
     writeln('Updating Wqt ' + qt_type + ' project', color=Fore.YELLOW)
     write('Updating Qt work environment - ', color=Fore.CYAN)
 
+    # the state is kept between updates of a long running process, only changes of this update count
+    state = get_state(path)
+    state.changed = False
+
     verify_project_structure(path, qt_type, False)
     fill_and_copy_config(qt_type, path, True)
     parse_and_copy_cmake(qt_type, path)
     copy_toolchain_files(path)
     update_qml_resources(path)
+    update_sources_manifest(path)
+    state.save()
+
+    if state.changed:
+        writeln('done')
+    else:
+        writeln('up to date')
 
-    writeln('done')
     writeln('Qt project updated', color=Fore.YELLOW)
+
+    return state.changed
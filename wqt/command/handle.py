@@ -2,118 +2,463 @@
 Handle building, listing, and showing WQt projects
 """
 
+import io
+import json
 import os
 import shutil
 import subprocess
+import time
 
 from colorama import Fore
 
-from wqt.command import creation
-from wqt.command.creation import (
-    update
-)
 from wqt.command.resource import (
-    get_configuration,
-    set_configuration
+    get_project_config
+)
+from wqt.templates.files import (
+    QType,
+    SOURCES_FILE
+)
+from wqt.utils.errors import (
+    BuildError,
+    ConfigureError,
+    ProjectError,
+    ToolError
 )
-from wqt.templates.files import QType
 from wqt.utils.finder import (
+    get_build_program,
     get_cmake_program,
+    get_compiler_cache,
     get_generator_for,
-    get_make_program,
+    get_program_path,
     get_qmlscene_program,
-    get_qmlviewer_program
+    get_qmlviewer_program,
+    uses_build_program
 )
 from wqt.utils.helper import (
+    BUILD_CONFIGS,
+    BUILD_TYPES,
+    get_bin_path,
+    get_build_configs,
+    get_build_path,
     get_files,
+    get_files_recursively,
     get_dirs,
+    get_job_count,
     get_valid_path,
     get_platform,
     any_folders_exist,
     OS
 )
 from wqt.utils.output import (
+    emit,
     writeln,
     write,
     error
 )
+from wqt.utils.profile import (
+    add_ninja_log,
+    get_ninja_log_size,
+    profiled,
+    span
+)
+from wqt.utils.runner import (
+    Command,
+    run as run_command
+)
+from wqt.utils.state import (
+    get_state,
+    hash_data
+)
 
 
-def build(path, generator=None, make=None, cmake=None):
-    """build WQt project"""
+def __configure_hash(path, generator, cmake_program, build_program):
+    """hashes everything that requires cmake to configure the project again"""
 
-    path = get_valid_path(path)
+    state = get_state(path)
 
-    # update thr project
-    update(path)
+    # wqt/sources.cmake changes when sources are added or removed
+    generated = [path + '/CMakeLists.txt', path + SOURCES_FILE] + get_files_recursively(path + '/wqt/cmake')
 
-    # verify there is a wqt folder
-    if not any_folders_exist(path + '/wqt'):
-        error("build files do not exist (wqt folder), aborting")
+    inputs = [str(generator), get_program_path(cmake_program), str(build_program and get_program_path(build_program))]
+    inputs += [str(state.output_hash(file)) for file in sorted(generated)]
 
-    writeln('WQt project build started', Fore.YELLOW)
+    return hash_data('\n'.join(inputs))
+
+
+def __update(path):
+    """updates the project, creation is imported here so commands that never update skip its imports"""
+
+    from wqt.command import creation
+
+    creation.update(path)
+
+
+def __cached_generator(build_path):
+    """returns the generator an existing build folder was configured with"""
+
+    if not os.path.exists(build_path + '/CMakeCache.txt'):
+        return None
+
+    # open is shadowed by the open command below
+    with io.open(build_path + '/CMakeCache.txt') as f:
+        for line in f:
+            if line.startswith('CMAKE_GENERATOR:'):
+                return line.split('=', 1)[1].strip()
+
+    return None
 
-    # check if build folder exists and if not make one
-    if not any_folders_exist(path + '/wqt/build'):
-        os.mkdir(path + '/wqt/build')
 
-    os.chdir(path + '/wqt/build')
+def __build_tools(generator, make, cmake):
+    """returns the cmake program, the build program and the generator to use, errors if a tool is missing"""
+
+    if make and not uses_build_program(generator):
+        error('--make only applies to the Ninja and Makefile generators, ' + generator + ' finds its build tool itself',
+              ProjectError)
 
     cmake_program = cmake or get_cmake_program()
-    make_program = make or get_make_program()
+    build_program = make or get_build_program(generator)
 
-    write('Verifying cmake and make installs - ', Fore.CYAN)
+    write('Verifying cmake and build tool installs - ', Fore.CYAN)
 
     # check if cmake is in environment paths (unix/linux based systems)
     if not cmake_program:
-        error('\ncmake does not exist, please install it or make sure it is in your environment PATH')
+        error('\ncmake does not exist, please install it or make sure it is in your environment PATH', ToolError)
 
-    # check if make is in environment paths (unix/linux based systems)
-    if not make_program:
-        error('\nmake does not exist, please install it or make sure it is in your environment PATH')
+    # check if make or ninja is in environment paths (unix/linux based systems)
+    if not build_program and uses_build_program(generator):
+        error('\nno build tool (make or ninja) exists for the generator, please install one or make sure it is in '
+              'your environment PATH', ToolError)
 
     writeln('done')
 
     if generator is None:
-        generator = get_generator_for(make_program)
+        generator = get_generator_for(build_program)
+
+    return cmake_program, build_program, generator
+
+
+def __remove_build_files(build_path, config):
+    """removes the files of a build folder, the default build folder keeps the folders of the configurations"""
+
+    for folder in get_dirs(build_path):
+        if config is not None or os.path.basename(folder) not in BUILD_CONFIGS:
+            shutil.rmtree(folder)
 
-    writeln('Running the build using cmake and ' + str(generator), Fore.CYAN)
-    cmake_code = subprocess.call(['cmake', '-G', str(generator), '../..'])
+    for file in get_files(build_path):
+        os.unlink(file)
+
+
+def __configure(path, cmake_program, build_program, generator, config=None, force=False):
+    """runs cmake in the build folder of config if its inputs changed since the last configure or force is set"""
+
+    build_path = get_build_path(path, config)
+
+    # check if build folder exists and if not make one
+    if not os.path.exists(build_path):
+        os.makedirs(build_path)
+
+    # cmake cannot switch the generator of an existing build folder
+    cached_generator = __cached_generator(build_path)
+
+    if cached_generator is not None and cached_generator != generator:
+        writeln('Generator changed from ' + cached_generator + ', removing old build files', Fore.CYAN)
+        __remove_build_files(build_path, config)
+
+    # configure only if the generated files, the source file set, the generator or the tools changed
+    state = get_state(path)
+    state_key = 'configure' + ('-' + config if config else '')
+    configure_hash = __configure_hash(path, generator, cmake_program, build_program)
+
+    if not force and state.get_input(state_key) == configure_hash and \
+            os.path.exists(build_path + '/CMakeCache.txt'):
+        writeln('Build files ' + ('of ' + config + ' ' if config else '') + 'are up to date, skipping cmake configure',
+                Fore.CYAN)
+        return
+
+    command = [cmake_program, '-G', str(generator)]
+
+    # only the make and ninja generators take the build program, the others would not find their own tool
+    if build_program:
+        command.append('-DCMAKE_MAKE_PROGRAM=' + get_program_path(build_program))
+
+    if config:
+        command += ['-DCMAKE_BUILD_TYPE=' + BUILD_TYPES[config], '-DWQT_CONFIG=' + config]
+
+    with span('cmake configure' + (' ' + config if config else '')):
+        cmake_code = run_command(command + [path], build_path, __log_file(path, 'configure', config), 'configure',
+                                 config)
 
     if cmake_code != 0:
-        error('Project build unsuccessful, cmake exited with error code ' + str(cmake_code))
+        error('Project configure unsuccessful, cmake exited with error code ' + str(cmake_code), ConfigureError,
+              cmake_code)
+
+    state.set_input(state_key, configure_hash)
+    state.save()
+
+
+def configure(path, generator=None, make=None, cmake=None, update_project=True, config=None):
+    """updates the project and runs cmake so the project can be built with build --no-configure"""
+
+    path = get_valid_path(path)
+
+    if update_project:
+        __update(path)
+
+    # verify there is a wqt folder
+    if not any_folders_exist(path + '/wqt'):
+        error("build files do not exist (wqt folder), aborting", ProjectError)
+
+    writeln('WQt project configure started', Fore.YELLOW)
+
+    cmake_program, build_program, generator = __build_tools(generator, make, cmake)
+
+    writeln('Configuring the project using cmake and ' + str(generator), Fore.CYAN)
+
+    for build_config in get_build_configs(config):
+        __configure(path, cmake_program, build_program, generator, build_config, True)
+
+    writeln('Project successfully configured', Fore.YELLOW)
+
+
+def __restore_artifacts(path, configs):
+    """restores the bin folders of the configurations that are in the artifact cache
+
+    returns the cache and the artifact key of every configuration, True for the ones that were restored
+    """
+
+    from wqt.utils import artifacts
+
+    cache = artifacts.get_artifact_cache(path)
+    keys = {}
+
+    if cache is None:
+        return None, keys
+
+    try:
+        with span('artifact restore'):
+            for config in configs:
+                key = artifacts.get_artifact_key(path, config)
+
+                # the bin folder already holds what the key built, the cache is not read and the files not rewritten
+                if artifacts.is_current(key, path, config):
+                    keys[config] = True
+                    emit('artifact', action='current', config=config, key=key)
+                elif artifacts.restore(cache, key, path, config):
+                    keys[config] = True
+                    writeln('Restored ' + os.path.relpath(get_bin_path(path, config), path) +
+                            ' from the artifact cache', Fore.CYAN)
+                    emit('artifact', action='restore', config=config, key=key)
+                else:
+                    keys[config] = key
+                    emit('artifact', action='miss', config=config, key=key)
+    except artifacts.CACHE_ERRORS as e:
+        writeln('Artifact cache is not available, building without it: ' + str(e), Fore.RED)
+        return None, {}
+
+    get_state(path).save()
+
+    return cache, keys
+
+
+def __store_artifacts(path, cache, keys, configs):
+    """stores the bin folders of the configurations that were built in the artifact cache"""
+
+    if cache is None:
+        return
+
+    from wqt.utils import artifacts
+
+    try:
+        with span('artifact store'):
+            for config in configs:
+                artifacts.store(cache, keys[config], path, config)
+                emit('artifact', action='store', config=config, key=keys[config])
+    except artifacts.CACHE_ERRORS as e:
+        writeln('Could not store the build in the artifact cache: ' + str(e), Fore.RED)
+
+    get_state(path).save()
+
+
+def __log_file(path, phase, config=None):
+    """returns the file the output of a phase is saved to"""
+
+    return path + '/wqt/logs/' + phase + ('-' + config if config else '') + '.log'
+
+
+def __build_command(cmake_program, build_path, jobs, config=None):
+    """returns the command that runs the build tool of the generator the build folder was configured with"""
+
+    command = [cmake_program, '--build', build_path, '--parallel', str(jobs)]
+
+    # multi configuration generators (Xcode, Visual Studio) build the configuration given here
+    if config:
+        command += ['--config', BUILD_TYPES[config]]
+
+    return command
+
+
+def __compile(path, cmake_program, jobs, config=None):
+    """runs the build tool in the build folder of config through cmake, returns its exit code"""
+
+    build_path = get_build_path(path, config)
+    ninja_log_size = get_ninja_log_size(build_path)
+    build_start = time.time()
+
+    with span('compile'):
+        build_code = run_command(__build_command(cmake_program, build_path, jobs, config), build_path,
+                                 __log_file(path, 'compile', config), 'compile', config)
 
-    make_code = subprocess.call([make_program])
+    # ninja logs the time of every compile and link step
+    add_ninja_log(build_path, ninja_log_size, build_start)
 
-    if make_code != 0:
-        error('Project build unsuccessful, make exited with error code ' + str(make_code))
+    return build_code
+
+
+def __compile_all(path, cmake_program, jobs, configs):
+    """compiles the configurations at the same time sharing the jobs, output goes to wqt/logs/compile-<config>.log
+
+    returns the configurations that failed
+    """
+
+    config_jobs = max(1, jobs // len(configs))
+    commands = []
+
+    with span('compile'):
+        for config in configs:
+            # the output of several build tools at once is unreadable, it is only logged
+            build_path = get_build_path(path, config)
+            command = Command(__build_command(cmake_program, build_path, config_jobs, config), build_path,
+                              __log_file(path, 'compile', config), 'compile', config, echo=False)
+
+            commands.append((config, command))
+            writeln('  started   ' + config + ' (' + str(config_jobs) + ' jobs)', Fore.CYAN)
+
+        failed = []
+
+        for config, command in commands:
+            if command.wait() == 0:
+                writeln('  built     ' + config, Fore.CYAN)
+            else:
+                failed.append(config)
+                writeln('  failed    ' + config + ', see wqt/logs/compile-' + config + '.log', Fore.RED)
+
+    return failed
+
+
+@profiled
+def build(path, generator=None, make=None, cmake=None, jobs=None, job_memory=None, update_project=True,
+          no_configure=False, config=None):
+    """build WQt project, compiling with jobs parallel processes (defaults to the cpu count)
+
+    update_project False skips updating the project, for callers that regenerated what changed themselves
+    no_configure True only runs the build tool in the build folder wqt configure created
+    config builds a configuration in its own build folder, all builds every configuration at the same time
+    """
+
+    path = get_valid_path(path)
+    configs = get_build_configs(config)
+
+    # update thr project
+    if update_project and not no_configure:
+        update_start = time.time()
+        emit('phase_start', phase='update')
+        __update(path)
+        emit('phase_end', phase='update', code=0, duration=time.time() - update_start)
+
+    # verify there is a wqt folder
+    if not any_folders_exist(path + '/wqt'):
+        error("build files do not exist (wqt folder), aborting", ProjectError)
+
+    writeln('WQt project build started', Fore.YELLOW)
+
+    if no_configure:
+        # the build folder already knows its generator and build program, cmake --build runs them
+        cmake_program = cmake or get_cmake_program()
+
+        if not cmake_program:
+            error('cmake does not exist, please install it or make sure it is in your environment PATH', ToolError)
+
+        for build_config in configs:
+            if not os.path.exists(get_build_path(path, build_config) + '/CMakeCache.txt'):
+                error('The project is not configured, run wqt configure first', ProjectError)
+    else:
+        cmake_program, build_program, generator = __build_tools(generator, make, cmake)
+
+        writeln('Running the build using cmake and ' + str(generator), Fore.CYAN)
+
+        for build_config in configs:
+            __configure(path, cmake_program, build_program, generator, build_config)
+
+    # configurations whose bin folder is in the artifact cache are not compiled
+    cache, keys = __restore_artifacts(path, configs)
+    configs = [build_config for build_config in configs if keys.get(build_config) is not True]
+
+    if not configs:
+        writeln('Project successfully built', Fore.YELLOW)
+        return
+
+    jobs = get_job_count(jobs, job_memory)
+    writeln('Compiling with ' + str(jobs) + ' parallel jobs', Fore.CYAN)
+
+    if len(configs) > 1:
+        failed = __compile_all(path, cmake_program, jobs, configs)
+
+        if failed:
+            error('Project build unsuccessful for ' + ', '.join(failed), BuildError)
+    else:
+        build_code = __compile(path, cmake_program, jobs, configs[0])
+
+        if build_code != 0:
+            error('Project build unsuccessful, the build tool exited with error code ' + str(build_code), BuildError,
+                  build_code)
+
+    __store_artifacts(path, cache, keys, configs)
 
     writeln('Project successfully built', Fore.YELLOW)
 
 
-def clean(path):
-    """clean WQt project's build folder"""
+# outputs of the compiler, clean --objects removes only these
+OBJECT_EXTENSIONS = ['.o', '.obj']
+
+
+def clean(path, objects=False, config=None):
+    """clean WQt project's build folder, or only the build folder of config
+
+    objects True removes only the object files, the cmake cache and the qt autogen outputs are kept so the next
+    build does not configure or run moc again
+    """
 
     path = get_valid_path(path)
+    build_path = get_build_path(path, None if config == 'all' else config)
 
     # confirm if build folder/path exists
-    if not any_folders_exist(path + '/wqt/build'):
-        error('No build files to clean')
+    if not any_folders_exist(build_path):
+        error('No build files to clean', ProjectError)
+
+    if objects:
+        write('Cleaning object files - ', Fore.CYAN)
+
+        for file in get_files_recursively(build_path, OBJECT_EXTENSIONS):
+            os.unlink(file)
+
+        writeln('done')
+        writeln('Project object files cleaned', color=Fore.YELLOW)
+        return
 
     # check if the current build files are for the current board
     # clean and build if boards are different
     try:
         write('Cleaning build files - ', Fore.CYAN)
 
-        for folder in get_dirs(path + '/wqt/build'):
+        for folder in get_dirs(build_path):
             shutil.rmtree(folder)
 
-        for file in get_files(path + '/wqt/build'):
+        for file in get_files(build_path):
             os.unlink(file)
     except IOError:
         writeln('Error while cleaning build files', Fore.CYAN)
 
-    shutil.rmtree(path + '/wqt/build')
+    shutil.rmtree(build_path)
 
     writeln('done')
     writeln('Project build files cleaned', color=Fore.YELLOW)
@@ -138,13 +483,15 @@ def add_lib(path, name):
 
     write('Adding library named ' + name + ' - ', color=Fore.CYAN)
 
-    libraries = get_configuration(path, 'library', 'qt')
+    config = get_project_config(path)
+    libraries = config.get('library', 'qt')
 
+    # the change is written by the update below
     if not str(name) in libraries.split():
         libraries += ' ' + name
-        set_configuration(path, 'library', 'qt', libraries)
+        config.set('library', 'qt', libraries)
     else:
-        error('\nLibrary already exist, libraries are: ' + libraries)
+        error('\nLibrary already exist, libraries are: ' + libraries, ProjectError)
 
     writeln('done')
     string_libs = 'Libraries left are: ' + libraries
@@ -154,7 +501,7 @@ def add_lib(path, name):
         write('#')
     writeln('')
 
-    creation.update(path)
+    __update(path)
 
 
 def rm_lib(path, name):
@@ -164,14 +511,15 @@ def rm_lib(path, name):
 
     write('Removing library named ' + name + ' - ', color=Fore.CYAN)
 
-    libraries = get_configuration(path, 'library', 'qt')
-    libraries_list = libraries.split()
+    config = get_project_config(path)
+    libraries_list = config.get_list('library', 'qt')
 
+    # the change is written by the update below
     if str(name) in libraries_list:
         libraries_list.remove(str(name))
-        set_configuration(path, 'library', 'qt', ' '.join(libraries_list))
+        config.set('library', 'qt', ' '.join(libraries_list))
     else:
-        error('\nNo such library to remove, libraries are: ' + libraries_list)
+        error('\nNo such library to remove, libraries are: ' + ' '.join(libraries_list), ProjectError)
 
     writeln('done')
     string_libs = 'Libraries left are: ' + ' '.join(libraries_list)
@@ -181,7 +529,7 @@ def rm_lib(path, name):
         write('#')
     writeln('')
 
-    creation.update(path)
+    __update(path)
 
 
 def list_libs(path):
@@ -191,44 +539,135 @@ def list_libs(path):
 
     writeln('Libraries used in the projects:', color=Fore.YELLOW)
 
-    libraries = get_configuration(path, 'library', 'qt')
-    libraries_list = libraries.split()
-
-    for lib in libraries_list:
+    for lib in get_project_config(path).get_list('library', 'qt'):
         writeln(lib, color=Fore.CYAN)
 
 
-def open(path):
-    """opens the executable file"""
+def get_executable_command(path, bundle=True, config=None):
+    """returns the command that starts the project's executable, None if it is not built
+
+    with bundle False, a mac application is started through its binary instead of the open command
+    """
+
+    config_data = get_project_config(path)
+    executable = config_data.get('project', 'name')
+    qt_type = config_data.get('project', 'type')
+    bin_path = get_bin_path(path, config)
+
+    if get_platform() == OS.mac and qt_type != QType.CONSOLE:
+        if not os.path.exists(bin_path + '/' + executable + '.app'):
+            return None
+        if bundle:
+            return ['open', bin_path + '/' + executable + '.app']
+        return [bin_path + '/' + executable + '.app/Contents/MacOS/' + executable]
+    elif get_platform() == OS.windows:
+        executable += '.exe'
+
+    if not os.path.exists(bin_path + '/' + executable):
+        return None
+
+    return [bin_path + '/' + executable]
+
+
+def open(path, config=None):
+    """opens the executable file, returns its exit code"""
 
     path = get_valid_path(path)
 
-    if not os.path.exists(path + '/bin/' + get_configuration(path, 'project', 'name')) and \
-            not os.path.exists(path + '/bin/' + get_configuration(path, 'project', 'name') + '.app'):
-        error('No executable available, build the project')
+    if config == 'all':
+        error('Choose the configuration to open, debug, release or relwithdebinfo', ProjectError)
 
-    executable = get_configuration(path, 'project', 'name')
-    qt_type = get_configuration(path, 'project', 'type')
+    command = get_executable_command(path, config=config)
 
-    if get_platform() == OS.mac:
-        if qt_type == QType.CONSOLE:
-            os.system('cls' if os.name == 'nt' else 'clear')
-            subprocess.call([path + '/bin/' + executable])
-            quit(2)
-        subprocess.call(['open', path + '/bin/' + executable + '.app'])
-    elif get_platform() == OS.windows:
-        subprocess.call([path + '/bin/' + executable + '.exe'])
-    else:
-        subprocess.call(['./' + path + '/bin/' + executable])
+    if command is None:
+        error('No executable available, build the project', ProjectError)
+
+    if get_platform() == OS.mac and get_project_config(path).get('project', 'type') == QType.CONSOLE:
+        os.system('cls' if os.name == 'nt' else 'clear')
+
+    return subprocess.call(command)
+
+
+def run(path, generator=None, make=None, cmake=None, jobs=None, job_memory=None, config=None):
+    """builds and executes the binary executable file, returns its exit code"""
+
+    path = get_valid_path(path)
+
+    if config == 'all':
+        error('Choose the configuration to run, debug, release or relwithdebinfo', ProjectError)
+
+    build(path, generator, make, cmake, jobs, job_memory, config=config)
+
+    return open(path, config)
 
 
-def run(path, generator=None, cmake=None, make=None):
-    """builds and executes the binary executable file"""
+def __ccache_stats(program):
+    """returns ccache hits and misses from its machine readable statistics"""
+
+    output = subprocess.check_output([program, '--print-stats']).decode('utf-8', 'replace')
+    stats = {}
+
+    for line in output.splitlines():
+        fields = line.split('\t')
+
+        if len(fields) == 2 and fields[1].strip().isdigit():
+            stats[fields[0]] = int(fields[1])
+
+    # key names changed in ccache 4
+    hits = stats.get('direct_cache_hit', stats.get('cache_hit_direct', 0)) + \
+        stats.get('preprocessed_cache_hit', stats.get('cache_hit_preprocessed', 0))
+    misses = stats.get('cache_miss', 0)
+
+    return hits, misses
+
+
+def __sccache_stats(program):
+    """returns sccache hits and misses from its json statistics"""
+
+    output = subprocess.check_output([program, '--show-stats', '--stats-format', 'json'])
+    stats = json.loads(output.decode('utf-8', 'replace'))['stats']
+
+    def count(value):
+        # counts are split per language in newer versions
+        if isinstance(value, dict):
+            return sum(value.get('counts', {}).values())
+        return value
+
+    return count(stats['cache_hits']), count(stats['cache_misses'])
+
+
+def cache_stats(path):
+    """shows the statistics and hit rate of the compiler cache used by the project"""
 
     path = get_valid_path(path)
 
-    build(path, generator, cmake, make)
-    open(path)
+    cache = get_project_config(path).get('build', 'cache', 'auto').strip()
+    program = get_compiler_cache(cache)
+
+    if program is None:
+        error('No compiler cache is used by this project, set cache in the build section of properties.ini',
+              ProjectError)
+
+    writeln('Compiler cache statistics for ' + program + ':', color=Fore.YELLOW)
+
+    subprocess.call([program, '--show-stats'])
+
+    if 'sccache' in os.path.basename(program):
+        read_stats = __sccache_stats
+    else:
+        read_stats = __ccache_stats
+
+    try:
+        hits, misses = read_stats(program)
+    except (subprocess.CalledProcessError, OSError, ValueError, KeyError):
+        writeln('Hit rate is not available for this version of ' + os.path.basename(program), color=Fore.CYAN)
+        return
+
+    if hits + misses == 0:
+        writeln('No compilations have gone through the cache yet', color=Fore.CYAN)
+    else:
+        writeln('Hit rate: ' + '{:.1f}'.format(100.0 * hits / (hits + misses)) + '% (' + str(hits) + ' hits, ' +
+                str(misses) + ' misses)', color=Fore.CYAN)
 
 
 def list_qml(path):
@@ -236,8 +675,8 @@ def list_qml(path):
 
     path = get_valid_path(path)
 
-    if not get_configuration(path, 'project', 'type') == QType.QUICK:
-        error('This project is not a Qt Quick project so no qml files')
+    if not get_project_config(path).get('project', 'type') == QType.QUICK:
+        error('This project is not a Qt Quick project so no qml files', ProjectError)
 
     writeln('Qml files for this project: ', color=Fore.YELLOW)
     files = get_files(path + '/res/qml')
@@ -252,8 +691,8 @@ def preview_qml(path, name):
 
     path = get_valid_path(path)
 
-    if not get_configuration(path, 'project', 'type') == QType.QUICK:
-        error('This project is not a Qt Quick project so no qml preview :(')
+    if not get_project_config(path).get('project', 'type') == QType.QUICK:
+        error('This project is not a Qt Quick project so no qml preview :(', ProjectError)
 
     qml_path = ''
 
@@ -267,4 +706,4 @@ def preview_qml(path, name):
     elif get_qmlviewer_program():
         subprocess.call(['qmlviewer', qml_path])
     else:
-        error('No Qml viewer program install please install qmlscene or qmlviewer')
+        error('No Qml viewer program install please install qmlscene or qmlviewer', ToolError)
@@ -3,10 +3,16 @@ Resource helps read resources from the Wqt created project
 """
 
 import os
+import re
 import sys
 
+from six import StringIO
+
 from wqt.templates.files import QType
+from wqt.utils.errors import ProjectError
+from wqt.utils.helper import list_dir
 from wqt.utils.output import error
+from wqt.utils.state import get_state
 
 if sys.version_info < (3, 0):
     import ConfigParser as configparser
@@ -14,28 +20,155 @@ else:
     import configparser
 
 
-def get_configuration(path, tag, key):
-    """Get configuration from the configuration file"""
+class ProjectConfig:
+    """Parsed properties.ini of a project, changes are kept in memory until save is called"""
 
-    if not os.path.exists(path + '/properties.ini'):
-        error('Configuration file does not exist')
+    def __init__(self, path, config_file=None):
+        self.path = path
+        self.file = path + '/properties.ini'
+        self.parser = configparser.ConfigParser()
+        self.parser.read(config_file or self.file)
+        self.dirty = False
+        self.key = self.__stat()
 
-    config = configparser.ConfigParser()
-    config.read(path + '/properties.ini')
+    def __stat(self):
+        """returns what identifies the version of properties.ini this config was read from"""
 
-    return config.get(tag, key)
+        if not os.path.exists(self.file):
+            return None
 
+        stat = os.stat(self.file)
+        return stat.st_mtime, stat.st_size
 
-def set_configuration(path, tag, key, value):
-    """Set configuration for the configuration file"""
+    def is_current(self):
+        """checks if properties.ini did not change since it was read"""
+
+        return self.dirty or self.key == self.__stat()
+
+    def has(self, tag, key):
+        return self.parser.has_option(tag, key)
+
+    def get(self, tag, key, default=None):
+        """returns an option as a string, default is returned if the option is missing"""
+
+        if default is not None and not self.parser.has_option(tag, key):
+            return default
+
+        return self.parser.get(tag, key)
+
+    def get_list(self, tag, key):
+        """returns a space separated option as a list"""
+
+        return self.get(tag, key, '').split()
+
+    def get_bool(self, tag, key, default=False):
+        """returns an option that turns a feature on or off"""
+
+        if not self.parser.has_option(tag, key):
+            return default
+
+        return self.parser.get(tag, key).strip().lower() in ['1', 'yes', 'true', 'on']
+
+    def get_int(self, tag, key, default):
+        """returns a numeric option, errors if it is not a number"""
+
+        value = self.get(tag, key, str(default)).strip()
+
+        if not value.isdigit():
+            error('\nInvalid ' + tag + ' ' + key + ' ' + value + ', it has to be a number', ProjectError)
+
+        return int(value)
+
+    def set(self, tag, key, value):
+        """sets an option, it is written when save is called"""
+
+        if not self.parser.has_section(tag):
+            self.parser.add_section(tag)
+
+        if not self.parser.has_option(tag, key) or self.parser.get(tag, key) != value:
+            self.parser.set(tag, key, value)
+            self.dirty = True
+
+    def merge_defaults(self, config_file):
+        """adds the options of config_file that are missing"""
+
+        defaults = configparser.ConfigParser()
+        defaults.read(config_file)
+
+        for section in defaults.sections():
+            for option in defaults.options(section):
+                if not self.parser.has_option(section, option):
+                    self.set(section, option, defaults.get(section, option))
+
+    def to_dict(self):
+        """returns the options as a dictionary of sections"""
+
+        dictionary = {}
+
+        for section in self.parser.sections():
+            dictionary[section] = {}
+
+            for option in self.parser.options(section):
+                dictionary[section][option] = self.parser.get(section, option)
+
+        return dictionary
+
+    def save(self):
+        """writes properties.ini once with all the changes, only if its content changed"""
+
+        data = StringIO()
+        self.parser.write(data)
+
+        # remove 2 extra spaces at the end
+        get_state(self.path).write(self.file, data.getvalue().strip().strip('\n'))
 
-    if not os.path.exists(path + '/properties.ini'):
-        error('Configuration file does not exist')
+        self.dirty = False
+        self.key = self.__stat()
 
-    config = configparser.ConfigParser()
-    config.read(path)
 
-    return config.set(tag, key, value)
+class Scope:
+    """holds the configurations loaded during this run"""
+
+    configs = {}
+
+
+def get_project_config(path):
+    """returns the configuration of the project, properties.ini is only parsed again if it changed on disk"""
+
+    config = Scope.configs.get(path)
+
+    if config is None or not config.is_current():
+        if not os.path.exists(path + '/properties.ini'):
+            error('Configuration file does not exist', ProjectError)
+
+        config = ProjectConfig(path)
+        Scope.configs[path] = config
+
+    return config
+
+
+def new_project_config(path, config_file):
+    """returns a configuration for the project read from a template, it replaces properties.ini on save"""
+
+    config = ProjectConfig(path, config_file)
+    config.dirty = True
+    Scope.configs[path] = config
+
+    return config
+
+
+def get_configuration(path, tag, key, default=None):
+    """Get configuration from the configuration file, default is returned if the option is missing"""
+
+    return get_project_config(path).get(tag, key, default)
+
+
+def set_configuration(path, tag, key, value):
+    """Set configuration for the configuration file"""
+
+    config = get_project_config(path)
+    config.set(tag, key, value)
+    config.save()
 
 
 def get_qt_type(path):
@@ -54,3 +187,37 @@ def get_qt_type(path):
         return QType.CONSOLE
     else:
         return None
+
+
+# sources in the tests folder that are each built into a test executable
+TEST_EXTENSIONS = ['.cpp', '.cxx']
+
+
+def get_tests(path):
+    """returns the tests of the project as a sorted list of dictionaries with the test name and its source file
+
+    every source directly in the tests folder is a test, headers and subfolders are shared by the tests
+    """
+
+    tests = []
+    files = {}
+
+    if not os.path.isdir(path + '/tests'):
+        return tests
+
+    for name in sorted(list_dir(path + '/tests')[0]):
+        stem, extension = os.path.splitext(name)
+
+        if extension in TEST_EXTENSIONS:
+            # cmake targets and ctest names only take a few characters besides letters and digits
+            test_name = re.sub(r'[^A-Za-z0-9_.-]', '_', stem)
+
+            # sources that only differ in those characters would build the same target
+            if test_name in files:
+                error('\nTests ' + files[test_name] + ' and ' + name + ' both build test_' + test_name +
+                      ', rename one of them', ProjectError)
+
+            files[test_name] = name
+            tests.append({'name': test_name, 'file': name})
+
+    return tests
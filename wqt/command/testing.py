@@ -0,0 +1,338 @@
+"""@package command
+Run the tests of WQt projects in parallel, the slowest first, and write JUnit or json reports
+"""
+
+import io
+import json
+import os
+import re
+import sys
+import threading
+import time
+from xml.sax.saxutils import escape, quoteattr
+
+from colorama import Fore
+
+from wqt.command.resource import get_tests
+from wqt.utils.errors import (
+    ProjectError,
+    TestError
+)
+from wqt.utils.helper import (
+    get_bin_path,
+    get_job_count,
+    get_platform,
+    get_valid_path,
+    OS
+)
+from wqt.utils.output import (
+    emit,
+    writeln,
+    error
+)
+from wqt.utils.runner import run as run_command
+from wqt.utils.state import get_state
+
+# PASS   : TestName::function(data tag) message
+QT_RESULT = re.compile(r'^(PASS|FAIL!|XFAIL|XPASS|SKIP|BPASS|BFAIL|BXPASS|BXFAIL)\s*:\s*([^:\s]+)::(\w+)\((.*?)\)'
+                       r'(?:\s+(.*))?$')
+
+# qt test results that fail a test and the ones that skip it, every other result passes
+FAILED_RESULTS = ['FAIL!', 'XPASS', 'BFAIL', 'BXPASS']
+SKIPPED_RESULTS = ['SKIP']
+
+
+def parse_shard(shard):
+    """returns (index, count) of a --shard value written as i/n with i from 1 to n"""
+
+    match = re.match(r'^(\d+)/(\d+)$', shard or '')
+
+    if not match or not 1 <= int(match.group(1)) <= int(match.group(2)):
+        error('Invalid shard ' + str(shard) + ', use i/n with i from 1 to n', ProjectError)
+
+    return int(match.group(1)), int(match.group(2))
+
+
+def get_shard(tests, index, count):
+    """returns the tests of a shard, tests are dealt to the shards by name so every machine picks the same ones"""
+
+    return [test for number, test in enumerate(sorted(tests, key=lambda item: item['name']))
+            if number % count == index - 1]
+
+
+def get_schedule(tests, timings):
+    """returns the tests ordered slowest first by their recorded seconds, tests never timed go first"""
+
+    return sorted(tests, key=lambda test: (-timings.get(test['name'], float('inf')), test['name']))
+
+
+def get_test_command(path, name, config=None):
+    """returns the command that runs a test, None if it is not built"""
+
+    executable = get_bin_path(path, config) + '/tests/test_' + name
+
+    if get_platform() == OS.windows:
+        executable += '.exe'
+
+    if not os.path.exists(executable):
+        return None
+
+    return [executable]
+
+
+def get_test_environment(path, config=None):
+    """returns the environment tests run in"""
+
+    env = dict(os.environ)
+
+    # shared user libraries are next to the executable in bin, windows looks for them in the path
+    env['PATH'] = get_bin_path(path, config) + os.pathsep + env.get('PATH', '')
+
+    # without a display qt cannot open windows, widgets and quick tests run offscreen instead
+    displays = ['DISPLAY', 'WAYLAND_DISPLAY', 'QT_QPA_PLATFORM']
+
+    if get_platform() == OS.linux and not any(env.get(name) for name in displays):
+        env['QT_QPA_PLATFORM'] = 'offscreen'
+
+    return env
+
+
+def parse_test_log(log_file):
+    """returns the test functions in the qt test output as dictionaries with name, status and message"""
+
+    cases = []
+
+    if not os.path.exists(log_file):
+        return cases
+
+    with io.open(log_file, encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.rstrip('\r\n')
+            match = QT_RESULT.match(line)
+
+            if match:
+                if match.group(1) in FAILED_RESULTS:
+                    status = 'failed'
+                elif match.group(1) in SKIPPED_RESULTS:
+                    status = 'skipped'
+                else:
+                    status = 'passed'
+
+                name = match.group(3) + ('(' + match.group(4) + ')' if match.group(4) else '')
+                cases.append({'name': name, 'status': status, 'message': match.group(5) or ''})
+            elif cases and cases[-1]['status'] == 'failed' and line.startswith('   '):
+                # the compared values and the location follow a failure indented
+                cases[-1]['message'] += '\n' + line.strip()
+
+    return cases
+
+
+class TestRun:
+    """runs tests on a number of threads, each thread takes the next test of the schedule when it is done"""
+
+    def __init__(self, path, config, schedule, jobs):
+        self.path = path
+        self.config = config
+        self.schedule = list(schedule)
+        self.jobs = jobs
+        self.env = get_test_environment(path, config)
+        self.results = []
+        self.lock = threading.Lock()
+
+    def __next(self):
+        with self.lock:
+            if not self.schedule:
+                return None
+            return self.schedule.pop(0)
+
+    def __work(self):
+        test = self.__next()
+
+        while test is not None:
+            result = self.__run(test)
+
+            with self.lock:
+                self.results.append(result)
+                self.__show(result)
+
+            test = self.__next()
+
+    def __run(self, test):
+        """runs a test and returns its result"""
+
+        name = test['name']
+        log_file = self.path + '/wqt/logs/test-' + name + ('-' + self.config if self.config else '') + '.log'
+        command = get_test_command(self.path, name, self.config)
+        start = time.time()
+
+        if command is None:
+            code = None
+            cases = []
+        else:
+            code = run_command(command, os.path.dirname(command[0]), log_file, 'test', self.config, echo=False,
+                               env=self.env)
+            cases = parse_test_log(log_file)
+
+        duration = time.time() - start
+
+        # a test that crashed or was not built fails even if none of its functions reported a failure
+        if code != 0 and not any(case['status'] == 'failed' for case in cases):
+            if code is None:
+                message = 'test executable was not built'
+            else:
+                message = 'exited with code ' + str(code)
+            cases.append({'name': name, 'status': 'failed', 'message': message})
+
+        status = 'failed' if code != 0 else 'passed'
+
+        return {'name': name, 'file': test['file'], 'status': status, 'code': code, 'duration': duration,
+                'log': log_file, 'cases': cases}
+
+    @staticmethod
+    def __show(result):
+        emit('test', name=result['name'], status=result['status'], code=result['code'],
+             duration=result['duration'], log=result['log'], cases=result['cases'])
+
+        if result['status'] == 'passed':
+            writeln('  passed  ' + result['name'] + ' ({:.2f}s)'.format(result['duration']), Fore.CYAN)
+            return
+
+        writeln('  failed  ' + result['name'] + ' ({:.2f}s)'.format(result['duration']) + ', see wqt/logs/' +
+                os.path.basename(result['log']), Fore.RED)
+
+        for case in result['cases']:
+            if case['status'] == 'failed':
+                writeln('          ' + case['name'] + ': ' + case['message'].replace('\n', '\n          '),
+                        Fore.RED)
+
+    def run(self):
+        """runs every test of the schedule and returns the results in the order they finished"""
+
+        threads = [threading.Thread(target=self.__work) for _ in range(min(self.jobs, len(self.schedule)))]
+
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        return self.results
+
+
+def get_junit_report(results, duration):
+    """returns the results as a JUnit xml report, every test is a suite of its qt test functions"""
+
+    failures = len([case for result in results for case in result['cases'] if case['status'] == 'failed'])
+    cases = len([case for result in results for case in result['cases']])
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<testsuites name="wqt" tests="' + str(cases) + '" failures="' + str(failures) + '" time="' +
+             '{:.3f}'.format(duration) + '">']
+
+    for result in sorted(results, key=lambda item: item['name']):
+        suite_failures = len([case for case in result['cases'] if case['status'] == 'failed'])
+        suite_skipped = len([case for case in result['cases'] if case['status'] == 'skipped'])
+
+        lines.append('    <testsuite name=' + quoteattr(result['name']) + ' tests="' + str(len(result['cases'])) +
+                     '" failures="' + str(suite_failures) + '" skipped="' + str(suite_skipped) + '" time="' +
+                     '{:.3f}'.format(result['duration']) + '">')
+
+        for case in result['cases']:
+            lines.append('        <testcase classname=' + quoteattr(result['name']) + ' name=' +
+                         quoteattr(case['name']) + '>')
+
+            if case['status'] == 'failed':
+                lines.append('            <failure message=' + quoteattr(case['message'].split('\n')[0]) + '>' +
+                             escape(case['message']) + '</failure>')
+            elif case['status'] == 'skipped':
+                lines.append('            <skipped message=' + quoteattr(case['message']) + '/>')
+
+            lines.append('        </testcase>')
+
+        lines.append('    </testsuite>')
+
+    lines.append('</testsuites>')
+
+    return '\n'.join(lines) + '\n'
+
+
+def write_report(report, results, duration):
+    """writes the results to the report file, a .json file gets json and every other file JUnit xml"""
+
+    if os.path.dirname(report) and not os.path.exists(os.path.dirname(report)):
+        os.makedirs(os.path.dirname(report))
+
+    if os.path.splitext(report)[1] == '.json':
+        data = json.dumps({'duration': duration, 'tests': sorted(results, key=lambda item: item['name'])},
+                          indent=2, sort_keys=True) + '\n'
+    else:
+        data = get_junit_report(results, duration)
+
+    with io.open(report, 'w', encoding='utf-8') as f:
+        f.write(data if sys.version_info >= (3, 0) else data.decode('utf-8'))
+
+
+def test(path, generator=None, make=None, cmake=None, jobs=None, job_memory=None, no_configure=False, config=None,
+         shard=None, report=None):
+    """builds the project and runs its tests on jobs threads (defaults to the number of cpus)
+
+    shard i/n runs the i-th of n parts of the tests, report is a JUnit xml or json file the results are written to
+    returns the result of every test that ran
+    """
+
+    from wqt.command import handle
+
+    path = get_valid_path(path)
+
+    if config == 'all':
+        error('Choose the configuration to test, debug, release or relwithdebinfo', ProjectError)
+
+    tests = get_tests(path)
+    names = [item['name'] for item in tests]
+
+    if shard is not None:
+        tests = get_shard(tests, *parse_shard(shard))
+
+    if not tests:
+        writeln('No tests to run, every source in the tests folder is a test', Fore.YELLOW)
+        return []
+
+    handle.build(path, generator, make, cmake, jobs, job_memory, no_configure=no_configure, config=config)
+
+    # timings of earlier runs order the tests so the slowest do not start last
+    state = get_state(path)
+    timings_key = 'tests' + ('-' + config if config else '')
+    timings = state.get_index(timings_key)
+    schedule = get_schedule(tests, timings)
+    jobs = get_job_count(jobs, job_memory)
+
+    writeln('Running ' + str(len(schedule)) + ' tests with ' + str(min(jobs, len(schedule))) + ' parallel jobs',
+            Fore.YELLOW)
+
+    start = time.time()
+    results = TestRun(path, config, schedule, jobs).run()
+    duration = time.time() - start
+
+    # tests that were not run in this shard keep their timings, removed tests are forgotten
+    new_timings = dict((name, seconds) for name, seconds in timings.items() if name in names)
+
+    for result in results:
+        if result['code'] is not None:
+            new_timings[result['name']] = round(result['duration'], 3)
+
+    state.set_index(timings_key, new_timings)
+    state.save()
+
+    if report:
+        write_report(report, results, duration)
+        writeln('Results written to ' + report, Fore.CYAN)
+
+    failed = [result['name'] for result in results if result['status'] == 'failed']
+
+    if failed:
+        error(str(len(failed)) + ' of ' + str(len(results)) + ' tests failed: ' + ', '.join(sorted(failed)), TestError,
+              results)
+
+    writeln('All ' + str(len(results)) + ' tests passed ({:.2f}s)'.format(duration), Fore.YELLOW)
+
+    return results
@@ -0,0 +1,337 @@
+"""@package command
+Watch a WQt project and rebuild it incrementally whenever its files change
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import subprocess
+import time
+
+from colorama import Fore
+
+from wqt.command.creation import update
+from wqt.command.handle import (
+    build,
+    get_executable_command
+)
+from wqt.command.resource import (
+    get_qt_type
+)
+from wqt.templates.operations import (
+    fill_and_copy_config,
+    parse_and_copy_cmake,
+    update_qml_resources,
+    update_sources_manifest
+)
+from wqt.toolchain.operations import (
+    copy_toolchain_files
+)
+from wqt.utils.errors import (
+    ProjectError,
+    WQtError
+)
+from wqt.utils.helper import (
+    get_dirs_recursively,
+    get_files_recursively,
+    get_platform,
+    get_valid_path,
+    OS
+)
+from wqt.utils.output import (
+    writeln,
+    error
+)
+from wqt.utils.state import get_state
+
+# folders and files of the project that are watched
+WATCHED_DIRS = ['src', 'lib', 'res', 'tests', 'wqt/cmake']
+WATCHED_FILES = ['properties.ini']
+
+# seconds without changes before a burst of saves is considered finished
+DEBOUNCE_TIME = 0.3
+
+# seconds between scans when inotify is not available
+POLL_INTERVAL = 0.5
+
+
+class PollingWatcher:
+    """Finds changes by comparing modification times and sizes of the watched files"""
+
+    def __init__(self, path):
+        self.path = path
+        self.overflow = False
+        self.snapshot = self.__scan()
+
+    def __scan(self):
+        snapshot = {}
+        files = [self.path + '/' + file for file in WATCHED_FILES]
+
+        for directory in WATCHED_DIRS:
+            if os.path.isdir(self.path + '/' + directory):
+                files += get_files_recursively(self.path + '/' + directory)
+
+        for file in files:
+            try:
+                stat = os.stat(file)
+                snapshot[file] = (stat.st_mtime, stat.st_size)
+            except OSError:
+                pass
+
+        return snapshot
+
+    def wait(self, timeout=None):
+        """waits up to timeout seconds (forever if None) and returns the set of changed files"""
+
+        start = time.time()
+
+        while True:
+            snapshot = self.__scan()
+            changes = set(file for file in set(snapshot) | set(self.snapshot)
+                          if snapshot.get(file) != self.snapshot.get(file))
+            self.snapshot = snapshot
+
+            if changes or (timeout is not None and time.time() - start >= timeout):
+                return changes
+
+            time.sleep(POLL_INTERVAL if timeout is None else min(POLL_INTERVAL, timeout))
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Finds changes through linux inotify events"""
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct('iIII')
+
+    def __init__(self, path, libc):
+        self.path = path
+        self.libc = libc
+        self.fd = libc.inotify_init()
+        self.watches = {}
+        self.overflow = False
+
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init failed')
+
+        # the project folder itself is watched for properties.ini
+        self.__add(path)
+
+        for directory in WATCHED_DIRS:
+            self.__add_recursively(path + '/' + directory)
+
+    def __add(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, directory.encode('utf-8'), self.MASK)
+
+        if wd >= 0:
+            self.watches[wd] = directory
+
+    def __add_recursively(self, directory):
+        if os.path.isdir(directory):
+            self.__add(directory)
+
+            for sub_directory in get_dirs_recursively(directory):
+                if sub_directory != directory:
+                    self.__add(sub_directory)
+
+    def __is_watched(self, file):
+        rel_path = os.path.relpath(file, self.path).replace('\\', '/')
+
+        return rel_path in WATCHED_FILES or any(rel_path.startswith(directory + '/') for directory in WATCHED_DIRS)
+
+    def wait(self, timeout=None):
+        """waits up to timeout seconds (forever if None) and returns the set of changed files"""
+
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+
+        if not readable:
+            return set()
+
+        data = os.read(self.fd, 64 * 1024)
+        changes = set()
+        offset = 0
+
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT.unpack_from(data, offset)
+            offset += self.EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0').decode('utf-8', 'replace')
+            offset += length
+
+            if mask & self.IN_Q_OVERFLOW:
+                # events were lost, the changes cannot be known so everything is regenerated
+                self.overflow = True
+                changes.add(self.path)
+                continue
+
+            if wd not in self.watches:
+                continue
+
+            file = self.watches[wd] + '/' + name if name else self.watches[wd]
+
+            # start watching new folders, including the watched folders created after startup
+            if mask & self.IN_ISDIR and mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                self.__add_recursively(file)
+
+            if self.__is_watched(file):
+                changes.add(file)
+
+        return changes
+
+    def close(self):
+        os.close(self.fd)
+
+
+def get_watcher(path):
+    """returns an inotify watcher on linux and a polling watcher elsewhere"""
+
+    if get_platform() == OS.linux:
+        library = ctypes.util.find_library('c')
+
+        try:
+            libc = ctypes.CDLL(library, use_errno=True)
+
+            if hasattr(libc, 'inotify_init'):
+                return InotifyWatcher(path, libc)
+        except OSError:
+            pass
+
+    return PollingWatcher(path)
+
+
+def regenerate(path, changes, full=False):
+    """regenerates only the project files affected by the changed files, every generated file if full"""
+
+    rel_paths = [os.path.relpath(file, path).replace('\\', '/') for file in changes]
+    qt_type = get_qt_type(path)
+
+    if full:
+        writeln('changes were lost, updating every generated file', Fore.CYAN)
+        update(path)
+        return
+
+    if 'properties.ini' in rel_paths:
+        writeln('properties.ini changed, updating configuration and CMakeLists.txt', Fore.CYAN)
+        fill_and_copy_config(qt_type, path, True)
+        parse_and_copy_cmake(qt_type, path)
+
+    # qrc files are generated, their own changes are not a reason to regenerate them
+    if any(rel_path.startswith('res/qml/') and not rel_path.endswith('.qrc') for rel_path in rel_paths):
+        writeln('qml resources changed, updating qrc files', Fore.CYAN)
+        update_qml_resources(path)
+
+        # the set of qrc files can change when resources are sharded
+        parse_and_copy_cmake(qt_type, path)
+
+    if any(rel_path.startswith('src/') or rel_path.startswith('lib/') for rel_path in rel_paths):
+        update_sources_manifest(path)
+
+        # user libraries can be added, removed or become header only
+        if any(rel_path.startswith('lib/') for rel_path in rel_paths):
+            parse_and_copy_cmake(qt_type, path)
+
+    # every source in tests is its own test executable in CMakeLists.txt
+    if any(rel_path.startswith('tests/') for rel_path in rel_paths):
+        parse_and_copy_cmake(qt_type, path)
+
+    if any(rel_path.startswith('wqt/cmake/') for rel_path in rel_paths):
+        writeln('toolchain files changed, restoring them', Fore.CYAN)
+        copy_toolchain_files(path)
+
+    get_state(path).save()
+
+
+def __build(path, generator, make, cmake, jobs, job_memory, update_project):
+    """builds the project, returns False instead of exiting if the build fails"""
+
+    try:
+        build(path, generator, make, cmake, jobs, job_memory, update_project)
+    except WQtError as e:
+        writeln(e.text, Fore.RED)
+        writeln('Build failed, waiting for changes', Fore.RED)
+        return False
+
+    return True
+
+
+def __start(path, process):
+    """stops the running executable and starts the new one"""
+
+    if process is not None and process.poll() is None:
+        process.terminate()
+        process.wait()
+
+    command = get_executable_command(path, bundle=False)
+
+    if command is None:
+        return None
+
+    writeln('Starting ' + os.path.basename(command[0]), Fore.YELLOW)
+    return subprocess.Popen(command)
+
+
+def watch(path, generator=None, make=None, cmake=None, jobs=None, job_memory=None, restart=False):
+    """watches the project and incrementally rebuilds it on changes, restarting the executable if asked"""
+
+    path = get_valid_path(path)
+
+    if get_qt_type(path) is None:
+        error('Cannot determine project Qt type, recreate the project!', ProjectError)
+
+    process = None
+
+    # watching starts before the first build so saves made while it runs are built next
+    watcher = get_watcher(path)
+
+    try:
+        if __build(path, generator, make, cmake, jobs, job_memory, True) and restart:
+            process = __start(path, process)
+
+        writeln('Watching ' + ', '.join(WATCHED_DIRS + WATCHED_FILES) + ' for changes (ctrl-c to stop)',
+                Fore.YELLOW)
+
+        while True:
+            changes = watcher.wait()
+
+            # collect the rest of a burst of saves
+            while True:
+                more_changes = watcher.wait(DEBOUNCE_TIME)
+
+                if not more_changes:
+                    break
+
+                changes |= more_changes
+
+            # files wqt generated itself, like the ones the first build wrote, are not changes of the user
+            state = get_state(path)
+            changes = set(file for file in changes if not state.is_current(file))
+            full = watcher.overflow
+            watcher.overflow = False
+
+            if not changes and not full:
+                continue
+
+            regenerate(path, changes, full)
+
+            if __build(path, generator, make, cmake, jobs, job_memory, False) and restart:
+                process = __start(path, process)
+    except KeyboardInterrupt:
+        writeln('Stopped watching', Fore.YELLOW)
+    finally:
+        watcher.close()
+
+        if process is not None and process.poll() is None:
+            process.terminate()
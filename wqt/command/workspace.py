@@ -0,0 +1,218 @@
+"""@package command
+Build every project of a workspace, running independent projects in parallel
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+from colorama import Fore
+
+from wqt.command.resource import (
+    ProjectConfig,
+    get_project_config
+)
+from wqt.utils.errors import (
+    BuildError,
+    ProjectError
+)
+from wqt.utils.helper import (
+    get_job_count,
+    get_valid_path,
+    linux_path
+)
+from wqt.utils.output import (
+    emit,
+    writeln,
+    error
+)
+
+WORKSPACE_FILE = 'wqt-workspace.ini'
+
+# seconds between checks of the running builds
+POLL_INTERVAL = 0.1
+
+
+def find_workspace(path):
+    """returns the folder of the workspace file in path or its parents, None if there is none"""
+
+    path = get_valid_path(path)
+
+    while True:
+        if os.path.exists(path + '/' + WORKSPACE_FILE):
+            return path
+
+        parent = linux_path(os.path.dirname(path))
+
+        if parent == path:
+            return None
+
+        path = parent
+
+
+def get_projects(workspace):
+    """returns the projects of the workspace as a dictionary of name to (path, dependencies)"""
+
+    # the workspace file is read like properties.ini
+    config = ProjectConfig(workspace, workspace + '/' + WORKSPACE_FILE)
+    paths = {}
+
+    for rel_path in config.get_list('workspace', 'projects'):
+        path = linux_path(os.path.join(workspace, rel_path))
+
+        if not os.path.exists(path + '/properties.ini'):
+            error('Workspace project ' + rel_path + ' is not a WQt project (no properties.ini)', ProjectError)
+
+        name = os.path.basename(path)
+
+        # projects are named after their folder, user libraries refer to them by that name
+        if name in paths and os.path.normpath(paths[name]) != os.path.normpath(path):
+            error('Workspace projects ' + paths[name] + ' and ' + path + ' have the same name ' + name +
+                  ', rename one of the folders', ProjectError)
+
+        paths[name] = path
+
+    # user libraries that are other projects of the workspace are dependencies
+    projects = {}
+
+    for name, path in paths.items():
+        user_libraries = get_project_config(path).get_list('library', 'user')
+        projects[name] = (path, sorted(set(library for library in user_libraries if library in paths)))
+
+    return projects
+
+
+def get_build_order(projects):
+    """returns the project names in dependency order, errors on dependency cycles"""
+
+    order = []
+    visiting = set()
+
+    def visit(name, chain):
+        if name in order:
+            return
+        if name in visiting:
+            error('Workspace projects depend on each other: ' + ' -> '.join(chain + [name]), ProjectError)
+
+        visiting.add(name)
+
+        for dependency in projects[name][1]:
+            visit(dependency, chain + [name])
+
+        visiting.remove(name)
+        order.append(name)
+
+    for name in sorted(projects):
+        visit(name, [])
+
+    return order
+
+
+def __start_build(path, jobs, options):
+    """starts building a project in its own process, output goes to wqt/logs/build.log"""
+
+    if not os.path.exists(path + '/wqt/logs'):
+        os.makedirs(path + '/wqt/logs')
+
+    log = open(path + '/wqt/logs/build.log', 'w')
+    command = [sys.executable, '-m', 'wqt.wqt', 'build', '--path', path, '--jobs', str(jobs)] + options
+
+    # the child runs the same wqt as this process, installed or not
+    env = dict(os.environ)
+    package_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    env['PYTHONPATH'] = os.pathsep.join([package_path] + ([env['PYTHONPATH']] if env.get('PYTHONPATH') else []))
+
+    process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT, env=env)
+
+    return process, log
+
+
+def build_all(path, generator=None, make=None, cmake=None, jobs=None, job_memory=None, no_configure=False,
+              config=None):
+    """builds all projects of the workspace, sharing jobs parallel jobs (defaults to the cpu count) between them"""
+
+    workspace = find_workspace(path)
+
+    if workspace is None:
+        error('No ' + WORKSPACE_FILE + ' found in the project folder or its parents', ProjectError)
+
+    projects = get_projects(workspace)
+    order = get_build_order(projects)
+    budget = get_job_count(jobs, job_memory)
+
+    options = []
+
+    if generator is not None:
+        options += ['--generator', generator]
+    if make is not None:
+        options += ['--make', make]
+    if cmake is not None:
+        options += ['--cmake', cmake]
+    if no_configure:
+        options += ['--no-configure']
+    if config is not None:
+        options += ['--config', config]
+
+    writeln('Building ' + str(len(order)) + ' workspace projects with ' + str(budget) + ' parallel jobs',
+            Fore.YELLOW)
+
+    pending = list(order)
+    running = {}
+    results = {}
+    used_jobs = 0
+    start = time.time()
+
+    while pending or running:
+        # projects whose dependencies failed are not built
+        for name in list(pending):
+            failed = [dependency for dependency in projects[name][1] if results.get(dependency, (True,))[0] is False]
+
+            if failed:
+                pending.remove(name)
+                results[name] = (False, 0, 'skipped, ' + ', '.join(failed) + ' failed')
+                writeln('  skipped   ' + name + ' (' + ', '.join(failed) + ' failed)', Fore.RED)
+
+        ready = [name for name in pending if all(dependency in results for dependency in projects[name][1])]
+
+        # split the free jobs between the projects that are ready, every build gets at least one
+        while ready and (used_jobs < budget or not running):
+            name = ready.pop(0)
+            project_jobs = max(1, (budget - used_jobs) // (len(ready) + 1))
+            process, log = __start_build(projects[name][0], project_jobs, options)
+
+            pending.remove(name)
+            running[name] = (process, log, project_jobs, time.time())
+            used_jobs += project_jobs
+            writeln('  started   ' + name + ' (' + str(project_jobs) + ' jobs)', Fore.CYAN)
+            emit('project_start', project=name, jobs=project_jobs)
+
+        time.sleep(POLL_INTERVAL)
+
+        for name, (process, log, project_jobs, project_start) in list(running.items()):
+            code = process.poll()
+
+            if code is None:
+                continue
+
+            log.close()
+            del running[name]
+            used_jobs -= project_jobs
+            elapsed = time.time() - project_start
+            emit('project_end', project=name, code=code, duration=elapsed,
+                 log=projects[name][0] + '/wqt/logs/build.log')
+
+            if code == 0:
+                results[name] = (True, elapsed, 'built')
+                writeln('  built     ' + name + ' in ' + '{:.1f}'.format(elapsed) + 's', Fore.CYAN)
+            else:
+                results[name] = (False, elapsed, 'failed, see ' + projects[name][0] + '/wqt/logs/build.log')
+                writeln('  failed    ' + name + ' in ' + '{:.1f}'.format(elapsed) + 's', Fore.RED)
+
+    writeln('Workspace build finished in ' + '{:.1f}'.format(time.time() - start) + 's', Fore.YELLOW)
+
+    for name in order:
+        writeln('  ' + name + ': ' + results[name][2], Fore.CYAN if results[name][0] else Fore.RED)
+
+    if not all(result[0] for result in results.values()):
+        error('Workspace build unsuccessful', BuildError)
@@ -0,0 +1,42 @@
+"""@package templates
+Engine renders templates from their parsed form, each template is parsed once per run and cached in memory
+"""
+
+import io
+import os
+
+import pystache
+from pystache.parser import parse
+
+from wqt.utils.profile import profiled
+
+
+class Scope:
+    """holds the templates parsed during this run by file"""
+
+    templates = {}
+
+
+@profiled
+def get_template(template_file):
+    """returns the parsed template, it is only parsed again when the file changes"""
+
+    stat = os.stat(template_file)
+    key = (stat.st_mtime, stat.st_size)
+    cached = Scope.templates.get(template_file)
+
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    with io.open(template_file, encoding='utf-8') as f:
+        template = parse(f.read())
+
+    Scope.templates[template_file] = (key, template)
+
+    return template
+
+
+def render(template_file, context):
+    """renders the template file with the context, the same as pystache.render on the file contents"""
+
+    return pystache.Renderer().render(get_template(template_file), context)
@@ -9,6 +9,9 @@ from wqt.utils.helper import (
     get_files_recursively
 )
 
+# sources of the project listed for cmake by wqt update
+SOURCES_FILE = '/wqt/sources.cmake'
+
 
 class QType:
     """Type of Qt application"""
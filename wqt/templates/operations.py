@@ -4,60 +4,62 @@ This file helps perform operations on template files
 
 import os
 import re
-import sys
-
-import pystache
-import xmltodict
+import time
+from xml.sax.saxutils import escape, quoteattr
 
 from wqt.command.resource import (
-    get_qt_type
+    get_project_config,
+    get_qt_type,
+    get_tests,
+    new_project_config
 )
+from wqt.templates.engine import render
 from wqt.templates.files import (
     QType,
     get_config_file,
     get_cmake_file,
     get_src_files,
-    get_res_files
+    get_res_files,
+    SOURCES_FILE
+)
+from wqt.toolchain.operations import get_toolchain_path
+from wqt.utils.errors import (
+    ProjectError,
+    ToolError
+)
+from wqt.utils.finder import (
+    compiler_cache_settings,
+    get_compiler_cache
 )
 from wqt.utils.helper import (
     get_files,
-    get_dirs_recursively,
-    copyfile
+    get_files_recursively,
+    copyfile,
+    list_dir,
+    quote_join
 )
 from wqt.utils.helper import (
     get_wqt_path,
     get_platform,
     OS,
+    RACY_TIME,
     create_folder
 )
-
-if sys.version_info < (3, 0):
-    import ConfigParser as configparser
-else:
-    import configparser
-
-
-def __ini_to_dictionary(config_file):
-    """converts ini file content to dictionary"""
-
-    config = configparser.ConfigParser()
-    config.read(config_file)
-
-    dictionary = {}
-    for section in config.sections():
-        dictionary[section] = {}
-        for option in config.options(section):
-            dictionary[section][option] = config.get(section, option)
-
-    return dictionary
+from wqt.utils.output import error
+from wqt.utils.profile import profiled
+from wqt.utils.state import (
+    get_state,
+    hash_data
+)
 
 
+@profiled
 def parse_and_copy_cmake(qt_type, path):
     """Parses template cmake files and fill them with info from config files"""
 
-    config_file = path + '/properties.ini'
+    config = get_project_config(path)
     cmake_file = get_cmake_file(qt_type)
-    config_dict = __ini_to_dictionary(config_file)
+    config_dict = config.to_dict()
 
     # update config with link library string
     qt_libraries = config_dict['library']['qt'].split()
@@ -70,42 +72,108 @@ def parse_and_copy_cmake(qt_type, path):
 
     link_str = link_str.strip(' ')
 
-    # TODO -> handle user libraries
+    # user libraries are folders of lib built as their own targets and linked into the application
+    library_type = config.get('library', 'user_type', 'static').strip().upper()
+
+    if library_type not in ['STATIC', 'SHARED']:
+        error('\nInvalid library user_type ' + library_type.lower() + ', use static or shared', ProjectError)
+
+    user_libs = []
+
+    for name in config.get_list('library', 'user'):
+        if not os.path.isdir(path + '/lib/' + name):
+            continue
+
+        if name == config.get('project', 'name'):
+            error('\nUser library ' + name + ' cannot have the same name as the project', ProjectError)
+
+        # header only libraries have nothing to compile
+        compiled = any(os.path.splitext(file)[1] in ['.cpp', '.cxx']
+                       for file in get_files_recursively(path + '/lib/' + name))
+        user_libs.append({'name': name, 'type': library_type, 'compiled': compiled})
+
+    config_dict['library']['user_libs'] = user_libs
+    config_dict['library']['shared'] = library_type == 'SHARED' and any(lib['compiled'] for lib in user_libs)
+    config_dict['library']['qt_link'] = link_str
+    config_dict['library']['link'] = ' '.join([lib['name'] for lib in user_libs] + [link_str]).strip()
+
+    # every source in the tests folder is built into a test executable linked with the user and qt libraries
+    tests = get_tests(path)
+    config_dict['tests'] = {'enabled': len(tests) > 0, 'list': tests}
+
+    # qml resources compiled into the executable and the ones built as external binary resources
+    if qt_type == QType.QUICK:
+        qrc_files = []
+        external = []
+
+        for name, is_external, entries in get_qml_resource_groups(path):
+            qrc = '${ROOT_DIR}/res/qml/' + name + '.qrc'
+
+            if is_external:
+                files = ['${ROOT_DIR}/res/qml/' + (file if rel_path == '.' else rel_path + '/' + file)
+                         for rel_path, names in entries for file in names]
+                external.append({'name': name[len('qml_'):], 'qrc': qrc, 'files': quote_join(files)})
+            else:
+                qrc_files.append(qrc)
+
+        config_dict.setdefault('resources', {})
+        config_dict['resources']['qrc'] = ' '.join(qrc_files)
+        config_dict['resources']['external'] = external
+
+    # resolve the compiler cache used as the compiler launcher
+    config_dict.setdefault('build', {})
+    cache = config.get('build', 'cache', 'auto').strip()
+
+    if cache not in compiler_cache_settings:
+        error('\nInvalid build cache ' + cache + ', use one of: ' + ' '.join(compiler_cache_settings), ProjectError)
+
+    launcher = get_compiler_cache(cache)
+
+    if launcher is None and cache not in ['auto', 'none']:
+        error('\n' + cache + ' is set as the build cache but it is not installed', ToolError)
+
+    # written into a quoted cmake string, where backslashes would be escapes
+    config_dict['build']['launcher'] = (launcher or '').replace('\\', '/')
 
-    config_dict['library']['link'] = link_str
+    # precompile the headers of the qt modules used and batch sources into unity builds
+    if config.get_bool('build', 'pch'):
+        config_dict['build']['pch_headers'] = ' '.join('<Qt' + library + '>' for library in qt_libraries)
+    else:
+        config_dict['build']['pch_headers'] = ''
+
+    if config.get_bool('build', 'unity'):
+        config_dict['build']['unity_batch'] = str(config.get_int('build', 'unity_batch', 8))
+    else:
+        config_dict['build']['unity_batch'] = ''
 
-    with open(cmake_file) as f:
-        template_data = ''.join(f.readlines())
+    # the option is a string in properties.ini, the template needs a boolean for its section
+    config_dict['build']['lto'] = config.get_bool('build', 'lto')
 
-    filled_data = pystache.render(template_data, config_dict)
+    # the shared toolchain folder of this wqt version, or wqt/cmake when the toolchain is vendored
+    config_dict['build']['toolchain_path'] = get_toolchain_path(path)
 
-    with open(path + '/CMakeLists.txt', 'w') as f:
-        f.write(filled_data)
+    get_state(path).write(path + '/CMakeLists.txt', render(cmake_file, config_dict))
 
 
+@profiled
 def fill_and_copy_config(qt_type, path, check=False):
     """fills the essential config information and writes the config file"""
 
     if check and os.path.exists(path + '/properties.ini'):
-        config_file = path + '/properties.ini'
-    else:
-        config_file = get_config_file(qt_type)
-    project_name = os.path.basename(path)
+        config = get_project_config(path)
 
-    config = configparser.ConfigParser()
-    config.read(config_file)
-    config.set('project', 'name', project_name)
-    config.set('project', 'type', qt_type)
-
-    with open(path + '/properties.ini', 'w') as f:
-        config.write(f)
+        # projects from before the shared toolchain keep their vendored copy until the user opts in
+        if not config.has('build', 'toolchain'):
+            config.set('build', 'toolchain', 'vendor')
 
-    # remove 2 extra spaces at the end
-    with open(path + '/properties.ini') as f:
-        data = ''.join(f.readlines())
+        # options added to the templates later get their default values
+        config.merge_defaults(get_config_file(qt_type))
+    else:
+        config = new_project_config(path, get_config_file(qt_type))
 
-    with open(path + '/properties.ini', 'w') as f:
-        f.write(data.strip().strip('\n'))
+    config.set('project', 'name', os.path.basename(path))
+    config.set('project', 'type', qt_type)
+    config.save()
 
 
 def copy_application_files(qt_type, path):
@@ -145,6 +213,7 @@ def copy_other_files(path):
              path + '/.gitignore')
 
 
+@profiled
 def verify_project_structure(project_path, qt_type, override):
     """Verify if project has a proper structure, otherwise make a proper structure"""
 
@@ -177,50 +246,286 @@ def verify_project_structure(project_path, qt_type, override):
         copyfile(get_wqt_path() + '/templates/applications/icon.icns', project_path + '/res/icons/', True)
 
 
+# files that are added to qml.qrc, the same kinds add_resources collects in the toolchain
+QML_RESOURCE_EXTENSIONS = ['.qml', '.js', '.mjs', '.json', '.cfg', '.png', '.jpg', '.jpeg', '.gif', '.svg', '.webp',
+                           '.ico', '.ttf', '.otf']
+QML_RESOURCE_NAMES = ['qmldir']
+
+
+def __scan_dir(directory, rel_path, index, new_index, accept):
+    """returns accepted files and subdirectories of a directory, reusing the index if the directory did not change"""
+
+    stat = os.stat(directory)
+    entry = index.get(rel_path)
+    racy = time.time() - stat.st_mtime <= RACY_TIME
+
+    # adding, removing or renaming entries changes the directory mtime, editing a file does not
+    if entry is None or racy or entry['mtime'] != stat.st_mtime or entry['size'] != stat.st_size:
+        # the listing of the run is shared with the other helpers, each folder is read once
+        names, dirs = list_dir(directory)[:2]
+        files = [name for name in names if accept(name)]
+
+        entry = {'mtime': stat.st_mtime, 'size': stat.st_size, 'files': sorted(files), 'dirs': sorted(dirs)}
+
+    # a directory changed this recently can change again without a new mtime, it is listed again next time
+    if not racy:
+        new_index[rel_path] = entry
+
+    return entry['files'], entry['dirs']
+
+
+def __is_qml_resource(name):
+    return os.path.splitext(name)[1] in QML_RESOURCE_EXTENSIONS or name in QML_RESOURCE_NAMES
+
+
+# ways of splitting qml resources into several qrc files
+QML_SHARD_SETTINGS = ['none', 'directory', 'size']
+
+
+def __scan_qml_resources(directory, rel_path, index, new_index, entries):
+    """appends (relative folder, files) of a directory and its subdirectories to entries in sorted order"""
+
+    files, dirs = __scan_dir(directory, rel_path, index, new_index, __is_qml_resource)
+
+    if files:
+        entries.append((rel_path, files))
+
+    for name in dirs:
+        __scan_qml_resources(directory + '/' + name, name if rel_path == '.' else rel_path + '/' + name,
+                             index, new_index, entries)
+
+
+def __qrc_name(name):
+    """returns a file and target friendly version of a folder name"""
+
+    return re.sub(r'[^A-Za-z0-9_]', '_', name)
+
+
+def get_qml_resource_groups(path):
+    """splits the qml resources into the qrc files they are written to
+
+    returns a list of (qrc name, external, [(relative folder, files)]) in a stable order
+    """
+
+    state = get_state(path)
+    qml_path = path + '/res/qml'
+    new_index = {}
+    entries = []
+
+    __scan_qml_resources(qml_path, '.', state.get_index('qml'), new_index, entries)
+    state.set_index('qml', new_index)
+
+    config = get_project_config(path)
+    shard = config.get('resources', 'shard', 'none').strip() or 'none'
+    external = config.get_list('resources', 'external')
+
+    if shard not in QML_SHARD_SETTINGS:
+        error('\nInvalid resources shard ' + shard + ', use one of: ' + ' '.join(QML_SHARD_SETTINGS), ProjectError)
+
+    # the main qrc is always written so a project without resources still builds like before
+    groups = {'qml': (False, [])}
+    owners = {'qml': 'res/qml'}
+    order = ['qml']
+
+    def add(name, owner, is_external, entry):
+        # folder names that only differ in characters a qrc name cannot have would share a qrc file
+        if owners.get(name, owner) != owner:
+            error('\nQml resources ' + owners[name] + ' and ' + owner + ' both go to ' + name + '.qrc, rename one '
+                  'of them', ProjectError)
+
+        if name not in groups:
+            groups[name] = (is_external, [])
+            owners[name] = owner
+            order.append(name)
+        groups[name][1].append(entry)
+
+    def add_shard(number, entry):
+        if number == 1:
+            add('qml', 'res/qml', False, entry)
+        else:
+            add('qml_shard_' + str(number), 'size shard ' + str(number), False, entry)
+
+    shard_size = 0
+    shard_number = 1
+
+    if shard == 'size':
+        shard_limit = max(1, config.get_int('resources', 'shard_size', 1024)) * 1024
+
+    for rel_path, files in entries:
+        top = rel_path.split('/')[0]
+
+        if top in external:
+            add('qml_' + __qrc_name(top), 'res/qml/' + top, True, (rel_path, files))
+        elif shard == 'directory':
+            if top == '.':
+                add('qml', 'res/qml', False, (rel_path, files))
+            else:
+                add('qml_' + __qrc_name(top), 'res/qml/' + top, False, (rel_path, files))
+        elif shard == 'size':
+            # start a new qrc file when the current one would go over the size budget
+            shard_files = []
+
+            for name in files:
+                size = os.path.getsize(qml_path + '/' + rel_path + '/' + name)
+
+                if shard_size > 0 and shard_size + size > shard_limit:
+                    if shard_files:
+                        add_shard(shard_number, (rel_path, shard_files))
+                    shard_files = []
+                    shard_size = 0
+                    shard_number += 1
+
+                shard_files.append(name)
+                shard_size += size
+
+            if shard_files:
+                add_shard(shard_number, (rel_path, shard_files))
+        else:
+            add('qml', 'res/qml', False, (rel_path, files))
+
+    return [(name, groups[name][0], groups[name][1]) for name in order]
+
+
+def __qrc_data(entries):
+    """returns the content of a qrc file listing the entries"""
+
+    lines = ['<RCC>']
+
+    for rel_path, files in entries:
+        prefix = '/' if rel_path == '.' else '/' + rel_path
+        lines.append('    <qresource prefix=' + quoteattr(prefix) + '>')
+
+        for name in files:
+            file = name if rel_path == '.' else rel_path + '/' + name
+            lines.append('        <file>' + escape(file) + '</file>')
+
+        lines.append('    </qresource>')
+
+    lines.append('</RCC>')
+
+    return '\n'.join(lines) + '\n'
+
+
+@profiled
 def update_qml_resources(path):
+    """writes the qrc files listing every qml resource, files are only written if their list changed"""
+
     qt_type = get_qt_type(path)
 
     if not qt_type == QType.QUICK:
         return
 
-    get_dirs = get_dirs_recursively(path + '/res/qml')
-    q_resources_dict = {}
+    state = get_state(path)
+    qml_path = path + '/res/qml'
+    qrc_files = []
 
-    n = 0
+    for name, external, entries in get_qml_resource_groups(path):
+        state.write(qml_path + '/' + name + '.qrc', __qrc_data(entries))
+        qrc_files.append(name + '.qrc')
 
-    for directory in get_dirs:
-        rel_path = os.path.relpath(directory, path + '/res/qml')
-        q_resource = 'qresource!' + str(n) + '!'
+    # remove qrc files generated by an earlier sharding
+    for name in state.get_index('qrc').get('files', []):
+        if name not in qrc_files and os.path.exists(qml_path + '/' + name):
+            os.unlink(qml_path + '/' + name)
 
-        if rel_path == '.':
-            q_resources_dict[q_resource] = {'@prefix': '/'}
+    state.set_index('qrc', {'files': qrc_files})
+
+
+SOURCE_EXTENSIONS = ['.h', '.hpp', '.cpp', '.cxx']
+
+
+def __is_source(name):
+    return os.path.splitext(name)[1] in SOURCE_EXTENSIONS
+
+
+def __scan_sources(directory, rel_path, index, new_index, files):
+    """appends the sources of a directory and its subdirectories to files, recently changed folders are listed again"""
+
+    names, dirs = __scan_dir(directory, rel_path, index, new_index, __is_source)
+    files += [rel_path + '/' + name for name in names]
+
+    for name in dirs:
+        __scan_sources(directory + '/' + name, rel_path + '/' + name, index, new_index, files)
+
+
+# macros moc has to run for, and includes of moc output that AUTOMOC has to find in a source
+MOC_PATTERN = re.compile(br'\b(Q_OBJECT|Q_GADGET|Q_NAMESPACE|Q_NAMESPACE_EXPORT)\b|'
+                         br'#\s*include\s*["<](moc_[^">]+\.cpp|[^">]+\.moc)[">]')
+
+
+def __needs_moc(file, key, index, new_index):
+    """checks if AUTOMOC has to look at the file, it is only read again when its mtime or size changed"""
+
+    stat = os.stat(file)
+    entry = index.get(key)
+    racy = time.time() - stat.st_mtime <= RACY_TIME
+
+    # an edit of the same size within one mtime tick keeps the mtime, recently changed files are read every time
+    if entry is None or racy or entry['mtime'] != stat.st_mtime or entry['size'] != stat.st_size:
+        with open(file, 'rb') as f:
+            data = f.read()
+
+        digest = hash_data(data)
+
+        # a file that was saved without changes keeps its result
+        if entry is None or entry['hash'] != digest:
+            moc = MOC_PATTERN.search(data) is not None
         else:
-            q_resources_dict[q_resource] = {'@prefix': '/' + rel_path}
+            moc = entry['moc']
+
+        entry = {'mtime': stat.st_mtime, 'size': stat.st_size, 'hash': digest, 'moc': moc}
+
+    if not racy:
+        new_index[key] = entry
+
+    return entry['moc']
+
+
+@profiled
+def update_sources_manifest(path):
+    """writes the sources of the project and of the user libraries to wqt/sources.cmake, only if they changed
+
+    with build -> moc_scan, the sources without Qt meta-object macros are listed too so AUTOMOC skips them
+    """
+
+    state = get_state(path)
+    config = get_project_config(path)
+    index = state.get_index('sources')
+    new_index = {}
+    moc_index = state.get_index('moc')
+    new_moc_index = {}
+    moc_scan = config.get_bool('build', 'moc_scan', True)
+
+    folders = ['src/' + config.get('project', 'name')]
+
+    if os.path.isdir(path + '/lib'):
+        folders += sorted('lib/' + name for name in list_dir(path + '/lib')[1])
 
-        # add all the files under that prefix
-        y = 0
-        files = get_files(directory, ['.qml'])
+    lines = ['# generated by wqt update from the files in src and lib, do not edit']
 
-        for file in files:
-            name = os.path.basename(file)
-            q_resources_dict[q_resource]['file!' + str(y) + '!'] = rel_path + '/' + name
-            y += 1
+    for folder in folders:
+        if not os.path.isdir(path + '/' + folder):
+            continue
 
-        n += 1
+        files = []
+        __scan_sources(path + '/' + folder, folder, index, new_index, files)
 
-    # check of qml.qrc file exists, if not, copy the template
-    copyfile(get_wqt_path() + '/templates/applications/quick/res/qml.qrc', path + '/res/qml/', True)
+        # add_sources in Functions.cmake looks the files up by the folder relative to the project
+        lines.append('')
+        lines.append('set("WQT_SOURCES_' + folder + '"')
+        lines += ['    "${ROOT_DIR}/' + file + '"' for file in sorted(files)]
+        lines.append(')')
 
-    with open(path + '/res/qml/qml.qrc') as fd:
-        doc = xmltodict.parse(fd.read())
+        if not moc_scan:
+            continue
 
-    doc['RCC'] = q_resources_dict
-    string = xmltodict.unparse(doc, pretty=True)
-    string = re.sub(r'![0-9]+!', '', string)
+        skipped = [file for file in sorted(files) if not __needs_moc(path + '/' + file, file, moc_index, new_moc_index)]
 
-    # write back to the line
-    with open(path + '/res/qml/qml.qrc', 'w') as fd:
-        str_list = string.split('\n')
+        if skipped:
+            lines.append('set("WQT_SKIP_AUTOMOC_' + folder + '"')
+            lines += ['    "${ROOT_DIR}/' + file + '"' for file in skipped]
+            lines.append(')')
 
-        for i in range(1, len(str_list)):
-            fd.write(str(str_list[i]) + '\n')
+    state.set_index('sources', new_index)
+    state.set_index('moc', new_moc_index)
+    state.write(path + SOURCES_FILE, '\n'.join(lines) + '\n')
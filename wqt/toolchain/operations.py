@@ -2,21 +2,183 @@
 This file helps perform operations on toolchain files
 """
 
-from distutils.dir_util import copy_tree
+import os
+import shutil
+import tempfile
+import time
 
+from wqt import __version__
+from wqt.command.resource import get_project_config
+from wqt.utils.errors import ProjectError
 from wqt.utils.helper import (
+    get_cache_path,
     get_platform,
     OS,
-    get_wqt_path
+    get_wqt_path,
+    get_dirnames,
+    get_dirs_recursively,
+    get_files_recursively,
+    create_folder,
+    list_dir
 )
+from wqt.utils.memoize import memoized
+from wqt.utils.output import error
+from wqt.utils.profile import profiled
+from wqt.utils.state import (
+    get_state,
+    hash_data,
+    hash_file
+)
+
+# shared uses one copy of the toolchain per wqt version for every project, vendor copies it to wqt/cmake
+TOOLCHAIN_SETTINGS = ['shared', 'vendor']
+
+# seconds after which a temporary install folder belongs to an install that did not finish
+STALE_INSTALL_TIME = 3600
+
+
+def get_toolchain_source():
+    """returns the folder of the toolchain files for the OS"""
+
+    if get_platform() == OS.mac:
+        return get_wqt_path() + '/toolchain/osx/cmake'
+
+    return get_wqt_path() + '/toolchain/others/cmake'
+
+
+def get_toolchain_mode(path):
+    """returns how the project gets the toolchain files, shared or vendor"""
+
+    # projects created before the setting existed keep the copy in wqt/cmake they were created with
+    mode = get_project_config(path).get('build', 'toolchain', 'vendor').strip() or 'vendor'
+
+    if mode not in TOOLCHAIN_SETTINGS:
+        error('\nInvalid build toolchain ' + mode + ', use one of: ' + ' '.join(TOOLCHAIN_SETTINGS), ProjectError)
+
+    return mode
+
+
+def __remove_stale_toolchains(cache_path, name):
+    """removes the toolchain folders of this wqt version that the current files replaced
+
+    other versions are kept, another wqt install may still use them, unfinished installs are removed
+    """
+
+    for folder in get_dirnames(cache_path):
+        if folder.startswith('.install-'):
+            stale = time.time() - os.stat(cache_path + '/' + folder).st_mtime > STALE_INSTALL_TIME
+        else:
+            stale = folder.startswith(__version__ + '-') and folder != name
+
+        if stale:
+            shutil.rmtree(cache_path + '/' + folder, ignore_errors=True)
+
+
+@memoized
+def get_shared_toolchain_path():
+    """returns the shared toolchain folder of this wqt version, the files are copied there once
+
+    the folder name also hashes the names and contents of the toolchain files, so every install of a version uses the
+    same folder and editing them in a development checkout gets a new folder instead of changing one in use
+    """
+
+    src_path = get_toolchain_source()
+    inputs = []
+
+    for file in sorted(get_files_recursively(src_path)):
+        inputs.append(os.path.relpath(file, src_path).replace('\\', '/') + ' ' + hash_file(file))
+
+    name = __version__ + '-' + hash_data('\n'.join(inputs))[:12]
+    toolchain_path = get_cache_path() + '/toolchain/' + name
+
+    if os.path.isdir(toolchain_path):
+        return toolchain_path
+
+    if not os.path.exists(os.path.dirname(toolchain_path)):
+        os.makedirs(os.path.dirname(toolchain_path))
+
+    # copied to a temporary folder and renamed so projects updating at the same time never see half a toolchain
+    temp_path = tempfile.mkdtemp(prefix='.install-', dir=os.path.dirname(toolchain_path))
+    shutil.rmtree(temp_path)
+    shutil.copytree(src_path, temp_path)
 
+    try:
+        os.rename(temp_path, toolchain_path)
+    except OSError:
+        # another project installed the same version first
+        shutil.rmtree(temp_path, ignore_errors=True)
 
+        if not os.path.isdir(toolchain_path):
+            raise
+
+    __remove_stale_toolchains(os.path.dirname(toolchain_path), name)
+
+    return toolchain_path
+
+
+def get_toolchain_path(path):
+    """returns the folder the generated CMakeLists.txt of the project takes the toolchain files from"""
+
+    if get_toolchain_mode(path) == 'vendor':
+        return '${CMAKE_CURRENT_SOURCE_DIR}/wqt/cmake'
+
+    return get_shared_toolchain_path()
+
+
+def __remove_vendored_files(path, src_path):
+    """removes the toolchain files an earlier vendor setting copied to wqt/cmake, edited files are kept"""
+
+    if not os.path.isdir(path + '/wqt/cmake'):
+        return
+
+    state = get_state(path)
+
+    for file in get_files_recursively(src_path):
+        dest = path + '/wqt/cmake/' + os.path.relpath(file, src_path).replace('\\', '/')
+
+        if state.is_current(dest):
+            os.unlink(dest)
+
+    # folders that still have files in them were not created by wqt, subfolders are removed before their parents
+    for folder in reversed(get_dirs_recursively(path + '/wqt/cmake')):
+        if not any(list_dir(folder)):
+            os.rmdir(folder)
+
+    state.set_index('toolchain', {})
+
+
+@profiled
 def copy_toolchain_files(path):
-    """Copies the toolchain files based on OS"""
-    os = get_platform()
-    toolchain_path = get_wqt_path() + '/toolchain'
-
-    if os == OS.mac:
-        copy_tree(toolchain_path + '/osx/cmake', path + '/wqt/cmake')
-    else:
-        copy_tree(toolchain_path + '/others/cmake', path + '/wqt/cmake')
+    """Installs the shared toolchain or copies the toolchain files based on OS to wqt/cmake
+
+    vendored files whose source did not change and that were not touched since they were copied are not read
+    """
+
+    src_path = get_toolchain_source()
+
+    if get_toolchain_mode(path) == 'shared':
+        get_shared_toolchain_path()
+        __remove_vendored_files(path, src_path)
+        return
+
+    state = get_state(path)
+    index = state.get_index('toolchain')
+    new_index = {}
+    create_folder(path + '/wqt/cmake')
+
+    for file in get_files_recursively(src_path):
+        rel_path = os.path.relpath(file, src_path).replace('\\', '/')
+        dest = path + '/wqt/cmake/' + rel_path
+        stat = os.stat(file)
+        entry = {'mtime': stat.st_mtime, 'size': stat.st_size}
+        new_index[rel_path] = entry
+
+        if index.get(rel_path) == entry and state.is_current(dest):
+            continue
+
+        create_folder(os.path.dirname(dest))
+
+        with open(file, 'rb') as f:
+            state.write(dest, f.read())
+
+    state.set_index('toolchain', new_index)
@@ -0,0 +1,327 @@
+"""@package utils
+Artifacts caches the bin folder of successful builds by a hash of everything that goes into it
+"""
+
+import io
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+from six.moves.urllib import request
+from six.moves.urllib.error import HTTPError, URLError
+
+from wqt import __version__
+from wqt.command.resource import get_project_config
+from wqt.toolchain.operations import (
+    get_toolchain_mode,
+    get_toolchain_path
+)
+from wqt.utils.helper import (
+    BUILD_CONFIGS,
+    get_bin_path,
+    get_build_path,
+    get_files_recursively
+)
+from wqt.utils.memoize import memoized
+from wqt.utils.state import (
+    get_state,
+    hash_data
+)
+
+# folders whose files go into the build, the configure inputs are added by get_artifact_key
+INPUT_DIRS = ['src', 'lib', 'res', 'tests', 'wqt/cmake']
+INPUT_FILES = ['properties.ini', 'CMakeLists.txt', 'wqt/sources.cmake']
+
+# cmake cache entries that select the compiler, the Qt install and the build type
+CACHE_ENTRIES = ['CMAKE_GENERATOR', 'CMAKE_BUILD_TYPE', 'CMAKE_CXX_COMPILER', 'CMAKE_CXX_FLAGS', 'Qt5_DIR',
+                 'Qt5Core_DIR']
+
+# megabytes the local cache may use before the least recently used artifacts are removed
+DEFAULT_CACHE_SIZE = 2048
+
+# seconds to wait for the http cache before building without it
+HTTP_TIMEOUT = 30
+
+
+def read_cmake_cache(build_path):
+    """returns the entries of the CMakeCache.txt in the build folder as a dictionary"""
+
+    entries = {}
+
+    if not os.path.exists(build_path + '/CMakeCache.txt'):
+        return entries
+
+    with io.open(build_path + '/CMakeCache.txt', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            if ':' in line and '=' in line and not line.startswith(('#', '//')):
+                name, value = line.split('=', 1)
+                entries[name.split(':', 1)[0]] = value.strip()
+
+    return entries
+
+
+@memoized
+def get_compiler_version(compiler):
+    """returns what the compiler reports as its version, empty if it cannot be run"""
+
+    try:
+        return subprocess.check_output([compiler, '--version'], stderr=subprocess.STDOUT).decode('utf-8', 'replace')
+    except (subprocess.CalledProcessError, OSError):
+        return ''
+
+
+def get_artifact_key(path, config=None):
+    """returns the hash of everything the bin folder of a configured build depends on"""
+
+    state = get_state(path)
+    index = state.get_index('hashes')
+    new_index = {}
+
+    files = [(file, path + '/' + file) for file in INPUT_FILES if os.path.exists(path + '/' + file)]
+
+    for folder in INPUT_DIRS:
+        files += [(os.path.relpath(file, path).replace('\\', '/'), file)
+                  for file in get_files_recursively(path + '/' + folder)]
+
+    # the shared toolchain folder is in the home folder, only its files are hashed so other machines get the same key
+    toolchain_path = get_toolchain_path(path)
+
+    if get_toolchain_mode(path) == 'shared':
+        files += [('toolchain/' + os.path.relpath(file, toolchain_path).replace('\\', '/'), file)
+                  for file in get_files_recursively(toolchain_path)]
+
+    inputs = [__version__, sys.platform, platform.machine(), str(config)]
+
+    for key, file in sorted(files):
+        stat = os.stat(file)
+        entry = index.get(key)
+
+        # files whose mtime and size did not change are not hashed again
+        if entry is None or entry['mtime'] != stat.st_mtime or entry['size'] != stat.st_size:
+            with open(file, 'rb') as f:
+                data = f.read()
+
+            if key == 'CMakeLists.txt':
+                data = data.replace(toolchain_path.encode('utf-8'), b'${WQT_TOOLCHAIN_DIR}')
+
+            entry = {'mtime': stat.st_mtime, 'size': stat.st_size, 'hash': hash_data(data)}
+
+        new_index[key] = entry
+        inputs.append(key + ' ' + entry['hash'])
+
+    state.set_index('hashes', new_index)
+
+    cache = read_cmake_cache(get_build_path(path, config))
+    inputs += [name + '=' + cache.get(name, '') for name in CACHE_ENTRIES]
+
+    if cache.get('CMAKE_CXX_COMPILER'):
+        inputs.append(get_compiler_version(cache['CMAKE_CXX_COMPILER']))
+
+    return hash_data('\n'.join(inputs))
+
+
+class LocalCache:
+    """artifacts stored as files in a folder, the least recently used ones are removed above max_size bytes"""
+
+    def __init__(self, folder, max_size):
+        self.folder = folder
+        self.max_size = max_size
+
+    def __file(self, key):
+        return self.folder + '/' + key + '.tar.gz'
+
+    def get(self, key, file):
+        """copies the artifact to file, returns False if it is not cached"""
+
+        if not os.path.exists(self.__file(key)):
+            return False
+
+        shutil.copyfile(self.__file(key), file)
+
+        # the modification time records when an artifact was last used
+        os.utime(self.__file(key), None)
+
+        return True
+
+    def put(self, key, file):
+        """stores the artifact and removes old ones if the cache is too big"""
+
+        if not os.path.exists(self.folder):
+            os.makedirs(self.folder)
+
+        # copied under a temporary name so other builds never restore half an artifact
+        temp_file = self.__file(key) + '.' + str(os.getpid())
+        shutil.copyfile(file, temp_file)
+
+        if os.path.exists(self.__file(key)):
+            os.remove(self.__file(key))
+
+        os.rename(temp_file, self.__file(key))
+        self.evict()
+
+    def evict(self):
+        """removes the least recently used artifacts until the cache fits in max_size"""
+
+        entries = []
+
+        for name in os.listdir(self.folder):
+            if name.endswith('.tar.gz'):
+                stat = os.stat(self.folder + '/' + name)
+                entries.append((stat.st_mtime, stat.st_size, name))
+
+        total = sum(entry[1] for entry in entries)
+
+        for mtime, size, name in sorted(entries):
+            if total <= self.max_size:
+                break
+
+            os.remove(self.folder + '/' + name)
+            total -= size
+
+
+class HttpCache:
+    """artifacts stored on a server that answers GET and PUT of <url>/<key>.tar.gz, eviction is left to it"""
+
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+
+    def get(self, key, file):
+        """downloads the artifact to file, returns False if the server does not have it"""
+
+        try:
+            response = request.urlopen(self.url + '/' + key + '.tar.gz', timeout=HTTP_TIMEOUT)
+        except HTTPError as e:
+            if e.code == 404:
+                return False
+            raise
+
+        with open(file, 'wb') as f:
+            shutil.copyfileobj(response, f)
+
+        response.close()
+
+        return True
+
+    def put(self, key, file):
+        """uploads the artifact"""
+
+        with open(file, 'rb') as f:
+            upload = request.Request(self.url + '/' + key + '.tar.gz', data=f.read(),
+                                     headers={'Content-Type': 'application/octet-stream'})
+
+        # python 2 requests do not take a method
+        upload.get_method = lambda: 'PUT'
+        request.urlopen(upload, timeout=HTTP_TIMEOUT).close()
+
+
+def get_artifact_cache(path):
+    """returns the artifact cache of the project, None if it does not use one
+
+    the WQT_ARTIFACTS environment variable or the build -> artifacts option is a folder or an http url
+    """
+
+    config = get_project_config(path)
+    location = os.environ.get('WQT_ARTIFACTS') or config.get('build', 'artifacts', '').strip()
+
+    if not location:
+        return None
+
+    if location.startswith('http://') or location.startswith('https://'):
+        return HttpCache(location)
+
+    size = config.get_int('build', 'artifacts_size', DEFAULT_CACHE_SIZE)
+
+    return LocalCache(os.path.abspath(os.path.expanduser(location)).replace('\\', '/'), size * 1024 * 1024)
+
+
+def __bin_entries(path, config):
+    """returns the names in the bin folder of the configuration, without the folders of the other configurations"""
+
+    bin_path = get_bin_path(path, config)
+
+    if not os.path.exists(bin_path):
+        return []
+
+    return [name for name in os.listdir(bin_path) if config is not None or name not in BUILD_CONFIGS]
+
+
+def __temp_archive():
+    """returns the path of a new empty temporary file for an archive"""
+
+    handle, archive = tempfile.mkstemp(suffix='.tar.gz')
+    os.close(handle)
+
+    return archive
+
+
+def __input_name(config=None):
+    """returns the state input the key of the bin folder of the configuration is recorded under"""
+
+    return 'artifact-' + (config or 'default')
+
+
+def is_current(key, path, config=None):
+    """returns True if the bin folder of the configuration was built or restored from key and still exists"""
+
+    return os.path.isdir(get_bin_path(path, config)) and get_state(path).get_input(__input_name(config)) == key
+
+
+def restore(cache, key, path, config=None):
+    """replaces the bin folder of the configuration with the cached artifact, returns False on a miss"""
+
+    archive = __temp_archive()
+
+    try:
+        if not cache.get(key, archive):
+            return False
+
+        bin_path = get_bin_path(path, config)
+
+        for name in __bin_entries(path, config):
+            if os.path.isdir(bin_path + '/' + name) and not os.path.islink(bin_path + '/' + name):
+                shutil.rmtree(bin_path + '/' + name)
+            else:
+                os.remove(bin_path + '/' + name)
+
+        if not os.path.exists(bin_path):
+            os.makedirs(bin_path)
+
+        with tarfile.open(archive, 'r:gz') as tar:
+            # artifacts can come from a server, files outside of the bin folder are refused where python can
+            if hasattr(tarfile, 'data_filter'):
+                tar.extractall(bin_path, filter='data')
+            else:
+                tar.extractall(bin_path)
+
+        get_state(path).set_input(__input_name(config), key)
+
+        return True
+    finally:
+        if os.path.exists(archive):
+            os.remove(archive)
+
+
+def store(cache, key, path, config=None):
+    """packs the bin folder of the configuration and stores it under key"""
+
+    archive = __temp_archive()
+    bin_path = get_bin_path(path, config)
+
+    try:
+        with tarfile.open(archive, 'w:gz') as tar:
+            for name in sorted(__bin_entries(path, config)):
+                tar.add(bin_path + '/' + name, name)
+
+        cache.put(key, archive)
+        get_state(path).set_input(__input_name(config), key)
+    finally:
+        if os.path.exists(archive):
+            os.remove(archive)
+
+
+# errors of an unreachable or broken cache, builds go on without the cache
+CACHE_ERRORS = (IOError, OSError, HTTPError, URLError, tarfile.TarError)
@@ -0,0 +1,45 @@
+"""@package utils
+Errors wqt raises, the command line shows their message and exits with code 2
+"""
+
+
+class WQtError(Exception):
+    """base of every error wqt raises"""
+
+    def __init__(self, message):
+        Exception.__init__(self, message.strip())
+
+        # messages that finish a status line written with write start with a new line
+        self.text = message
+
+
+class ProjectError(WQtError):
+    """the project, its path or its properties.ini cannot be used for the command"""
+
+
+class ToolError(WQtError):
+    """a program the command needs is not installed"""
+
+
+class ConfigureError(WQtError):
+    """cmake failed, code is its exit code"""
+
+    def __init__(self, message, code=None):
+        WQtError.__init__(self, message)
+        self.code = code
+
+
+class BuildError(WQtError):
+    """the build tool failed, code is its exit code if a single build failed"""
+
+    def __init__(self, message, code=None):
+        WQtError.__init__(self, message)
+        self.code = code
+
+
+class TestError(WQtError):
+    """tests failed, results has the result of every test that ran"""
+
+    def __init__(self, message, results=None):
+        WQtError.__init__(self, message)
+        self.results = results or []
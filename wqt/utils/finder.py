@@ -9,11 +9,34 @@ make_programs = [
     'mingw32-make.exe',
 ]
 
+ninja_programs = [
+    'ninja',
+    'ninja.exe',
+    'ninja-build',
+]
+
 cmake_programs = [
     'cmake',
     'cmake.exe',
 ]
 
+ccache_programs = [
+    'ccache',
+    'ccache.exe',
+]
+
+sccache_programs = [
+    'sccache',
+    'sccache.exe',
+]
+
+compiler_cache_settings = [
+    'auto',
+    'ccache',
+    'sccache',
+    'none',
+]
+
 qmlscene_program = [
     'qmlscene',
     'qmlscene.exe'
@@ -35,6 +58,19 @@ def cmd_exists(cmd):
     )
 
 
+def get_program_path(program):
+    """returns the absolute path of the program, searching the PATH if needed"""
+
+    if os.path.dirname(program):
+        return os.path.abspath(program)
+
+    for path in os.environ['PATH'].split(os.pathsep):
+        if os.access(os.path.join(path, program), os.X_OK):
+            return os.path.abspath(os.path.join(path, program))
+
+    return program
+
+
 def get_program(programs):
     for program in programs:
         if cmd_exists(program):
@@ -43,8 +79,12 @@ def get_program(programs):
 
 
 @memoized
-def get_generator_for(make_program):
-    if 'mingw' in make_program:
+def get_generator_for(build_program):
+    name = os.path.basename(build_program)
+
+    if 'ninja' in name:
+        return 'Ninja'
+    if 'mingw' in name:
         return 'MinGW Makefiles'
     return 'Unix Makefiles'
 
@@ -54,11 +94,55 @@ def get_make_program():
     return get_program(make_programs)
 
 
+@memoized
+def get_ninja_program():
+    return get_program(ninja_programs)
+
+
+# generators that build with make or ninja, the others (Xcode, Visual Studio, NMake) find their build tool themselves
+MAKE_GENERATORS = ['Unix Makefiles', 'MinGW Makefiles', 'MSYS Makefiles']
+
+
+def uses_build_program(generator=None):
+    """checks if the generator builds with the make or ninja program wqt passes to cmake"""
+
+    return generator is None or 'ninja' in generator.lower() or generator in MAKE_GENERATORS
+
+
+@memoized
+def get_build_program(generator=None):
+    """returns the program that builds for the generator, ninja is preferred when no generator is given
+
+    None for generators that do not build with make or ninja
+    """
+
+    if not uses_build_program(generator):
+        return None
+    if generator is None:
+        return get_ninja_program() or get_make_program()
+    if 'ninja' in generator.lower():
+        return get_ninja_program()
+    return get_make_program()
+
+
 @memoized
 def get_cmake_program():
     return get_program(cmake_programs)
 
 
+@memoized
+def get_compiler_cache(setting='auto'):
+    """returns the compiler cache program for the setting, None if no cache is used or it is not installed"""
+
+    if setting == 'auto':
+        return get_program(ccache_programs) or get_program(sccache_programs)
+    if setting == 'ccache':
+        return get_program(ccache_programs)
+    if setting == 'sccache':
+        return get_program(sccache_programs)
+    return None
+
+
 @memoized
 def get_qmlscene_program():
     return get_program(qmlscene_program)
@@ -5,10 +5,17 @@ Helper functions to be used through the tool
 import os
 import shutil
 import sys
+import time
 from os.path import abspath, dirname
 
+from wqt.utils.errors import ProjectError
 from wqt.utils.output import error
 
+try:
+    from os import scandir
+except ImportError:
+    scandir = None
+
 
 class OS:
     mac = 0
@@ -33,11 +40,59 @@ def get_platform():
     return platforms[sys.platform]
 
 
+def get_cpu_count():
+    """Returns the number of cpus this process can run on"""
+
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+
+    import multiprocessing
+
+    try:
+        return multiprocessing.cpu_count()
+    except NotImplementedError:
+        return 1
+
+
+def get_free_memory():
+    """Returns the available physical memory in megabytes, None if it cannot be determined"""
+
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) // 1024
+    except (IOError, OSError, ValueError):
+        pass
+
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE') // (1024 * 1024)
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def get_job_count(jobs=None, memory_per_job=None):
+    """Returns the number of parallel build jobs, defaults to the cpu count capped by free memory per job"""
+
+    if jobs is not None:
+        return max(1, jobs)
+
+    jobs = get_cpu_count()
+
+    if memory_per_job:
+        free_memory = get_free_memory()
+
+        if free_memory is not None:
+            jobs = min(jobs, max(1, free_memory // memory_per_job))
+
+    return jobs
+
+
 def verify_path(path):
     """check if the project path is correct"""
 
     if not os.path.exists(path) or not os.path.isdir(path):
-        error('Path specified for project creation does not exist or is not a directory')
+        error('Path specified for project creation does not exist or is not a directory', ProjectError)
 
 
 def get_valid_path(path):
@@ -68,6 +123,38 @@ def linux_path(path):
     return os.path.abspath(path).replace('\\', '/')
 
 
+# configurations build --config can build, with the cmake build type of each
+BUILD_CONFIGS = ['debug', 'release', 'relwithdebinfo']
+BUILD_TYPES = {'debug': 'Debug', 'release': 'Release', 'relwithdebinfo': 'RelWithDebInfo'}
+
+
+def get_build_configs(config):
+    """returns the configurations to build for the --config value, [None] builds the default one"""
+
+    if config == 'all':
+        return list(BUILD_CONFIGS)
+
+    return [config]
+
+
+def get_build_path(path, config=None):
+    """returns the build folder of a configuration, the default one builds in wqt/build itself"""
+
+    return path + '/wqt/build' + ('/' + config if config else '')
+
+
+def get_bin_path(path, config=None):
+    """returns the folder a configuration writes the executable to"""
+
+    return path + '/bin' + ('/' + config if config else '')
+
+
+def get_cache_path():
+    """returns the folder wqt keeps caches shared between projects in, WQT_CACHE overrides it"""
+
+    return linux_path(os.environ.get('WQT_CACHE') or os.path.expanduser('~/.wqt/cache'))
+
+
 def get_wqt_path():
     """returns the absolute path of wcosa"""
 
@@ -108,71 +195,130 @@ def create_folder(path, override=False):
         os.mkdir(path)
 
 
+class Scope:
+    """holds the directory listings read during this run"""
+
+    listings = {}
+
+
+# directories changed this recently are listed again, their mtime may not show the next change yet
+RACY_TIME = 2
+
+
+def __scan(path):
+    """returns the file names, directory names and directory symlink names of a directory"""
+
+    files = []
+    dirs = []
+    links = []
+
+    if scandir is not None:
+        for entry in scandir(path):
+            if entry.is_dir():
+                dirs.append(entry.name)
+
+                if entry.is_symlink():
+                    links.append(entry.name)
+            else:
+                files.append(entry.name)
+    else:
+        for name in os.listdir(path):
+            if os.path.isdir(path + '/' + name):
+                dirs.append(name)
+
+                if os.path.islink(path + '/' + name):
+                    links.append(name)
+            else:
+                files.append(name)
+
+    return files, dirs, links
+
+
+def list_dir(path):
+    """returns (files, dirs, links) names of a directory, a directory is only read again once it changes"""
+
+    stat = os.stat(path)
+    listing = Scope.listings.get(path)
+
+    # adding, removing or renaming entries changes the directory mtime, so one stat validates the listing
+    if listing is None or listing[0] != (stat.st_mtime, stat.st_size):
+        listing = ((stat.st_mtime, stat.st_size),) + __scan(path)
+
+        if time.time() - stat.st_mtime > RACY_TIME:
+            Scope.listings[path] = listing
+
+    return listing[1:]
+
+
+def __walk(path, files, dirs):
+    """appends the files and directories inside path to the lists like os.walk would visit them"""
+
+    try:
+        names, dir_names, links = list_dir(path)
+    except OSError:
+        return
+
+    if files is not None:
+        files += [path + '/' + name for name in names]
+
+    # like os.walk, symlinks to directories are not followed
+    for name in dir_names:
+        if name in links:
+            continue
+
+        if dirs is not None:
+            dirs.append(path + '/' + name)
+
+        __walk(path + '/' + name, files, dirs)
+
+
 def get_files_recursively(directory, extensions=None):
     """gathers a list of all the files with the extensions recursively in a directory"""
 
-    arr = []
-    for root, dirs, files in os.walk(directory):
-        path = root.split(os.sep)
-        for file in files:
-            ext = os.path.splitext(file)[1]
+    files = []
+    __walk(linux_path(directory), files, None)
 
-            if extensions is not None and ext in extensions:
-                arr.append(linux_path('/'.join(path) + '/' + file))
-            elif extensions is None:
-                arr.append(linux_path('/'.join(path) + '/' + file))
+    if extensions is None:
+        return files
 
-    return arr
+    return [file for file in files if os.path.splitext(file)[1] in extensions]
 
 
 def get_files(path, extensions=None):
     """gathers a list of all the files with the extensions in a directory"""
 
-    arr = []
-    all_files = os.listdir(path)
+    path = linux_path(path)
+    names = list_dir(path)[0]
 
-    for file in all_files:
-        if not os.path.isdir(path + '/' + file) and extensions is not None and os.path.splitext(file)[1] in extensions:
-            arr.append(linux_path(path + '/' + file))
-        elif not os.path.isdir(path + '/' + file) and extensions is None:
-            arr.append(linux_path(path + '/' + file))
-
-    return arr
+    return [path + '/' + name for name in names if extensions is None or os.path.splitext(name)[1] in extensions]
 
 
 def get_dirs_recursively(path):
-    """gathers a list of all the subdirectories recursively inside the path"""
+    """gathers a list of the path and all the subdirectories recursively inside it"""
+
+    path = linux_path(path)
 
-    arr = []
-    for root, dirs, files in os.walk(path):
-        curr_path = '/'.join(root.split(os.sep))
+    if not os.path.isdir(path):
+        return []
 
-        if curr_path != os.path.basename(path):
-            arr.append(linux_path(curr_path))
+    dirs = [path]
+    __walk(path, None, dirs)
 
-    return arr
+    return dirs
 
 
 def get_dirs(path):
     """gathers a list of all the subdirectories inside the path"""
 
-    arr = []
-    for file in os.listdir(path):
-        if os.path.isdir(path + '/' + file):
-            arr.append(linux_path(path + '/' + file))
+    path = linux_path(path)
 
-    return arr
+    return [path + '/' + name for name in list_dir(path)[1]]
 
 
 def get_dirnames(path):
     """gathers a list of all the names of subdirectories inside the path"""
 
-    arr = []
-    for file in os.listdir(path):
-        if os.path.isdir(path + '/' + file):
-            arr.append(os.path.basename(linux_path(path + '/' + file)))
-
-    return arr
+    return list(list_dir(linux_path(path))[1])
 
 
 def copyfile(src, dest, same_name=False, override=False):
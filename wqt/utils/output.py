@@ -4,15 +4,18 @@ Output is a wrapper over print to provide coloring and verbose mode
 
 from __future__ import print_function
 
+import json
 import os
 import sys
+import time
 
 from colorama import (
     init,
-    Style,
-    Fore
+    Style
 )
 
+from wqt.utils.errors import WQtError
+
 
 class Scope:
     """holds the verbose flag and output status flag"""
@@ -20,12 +23,56 @@ class Scope:
     verbose_flag = False
     output_status_flag = True
     original_stdout = sys.stdout
+    output_mode = 'text'
+    listeners = []
 
 
 init()
 scope = Scope()
 
 
+# text shows everything the tools print, progress a progress bar and diagnostics, json build events only and
+# quiet nothing, the output of the tools is always saved in wqt/logs
+OUTPUT_MODES = ['text', 'progress', 'json', 'quiet']
+
+
+def set_output_mode(mode):
+    Scope.output_mode = mode
+
+
+def get_output_mode():
+    return Scope.output_mode
+
+
+def add_listener(listener):
+    """calls listener with the fields of every build event until it is removed"""
+
+    Scope.listeners.append(listener)
+
+
+def remove_listener(listener):
+    Scope.listeners.remove(listener)
+
+
+def emit(event, **fields):
+    """passes a build event to the listeners and writes it as a line of json in json output mode"""
+
+    if Scope.output_mode != 'json' and not Scope.listeners:
+        return
+
+    fields['event'] = event
+    fields['time'] = time.time()
+
+    for listener in list(Scope.listeners):
+        listener(fields)
+
+    if Scope.output_mode != 'json':
+        return
+
+    sys.stdout.write(json.dumps(fields, sort_keys=True) + '\n')
+    sys.stdout.flush()
+
+
 def set_verbose(status):
     """turns verbose flag on and off"""
 
@@ -55,6 +102,9 @@ def verbose(string, newline, color=Style.RESET_ALL):
 def write(string='', color=Style.RESET_ALL):
     """write a string with color specified. No new line"""
 
+    if Scope.output_mode in ['json', 'quiet']:
+        return
+
     print(color, end='')
     print(string, end='')
     print(Style.RESET_ALL, end='')
@@ -63,11 +113,15 @@ def write(string='', color=Style.RESET_ALL):
 def writeln(string='', color=Style.RESET_ALL):
     """write a string with color specified. New line"""
 
+    if Scope.output_mode in ['json', 'quiet']:
+        return
+
     print(color, end='')
     print(string, end='')
     print(Style.RESET_ALL)
 
 
-def error(string):
-    writeln(string, Fore.RED)
-    quit(2)
+def error(string, kind=WQtError, *args):
+    """raises an error of the kind with the message, the command line shows it and exits with code 2"""
+
+    raise kind(string, *args)
@@ -0,0 +1,173 @@
+"""@package utils
+Profile records how long each phase of a command takes and writes the timing reports
+"""
+
+import functools
+import json
+import os
+import time
+from contextlib import contextmanager
+
+PROFILE_FILE = '/wqt/profile.json'
+TRACE_FILE = '/wqt/trace.json'
+
+
+class Scope:
+    """holds the profiling flag and the recorded spans"""
+
+    enabled = False
+    start = time.time()
+    spans = []
+    units = []
+
+
+def get_process_start():
+    """returns when this process started (epoch seconds), so python startup is part of the profile"""
+
+    try:
+        with open('/proc/self/stat') as f:
+            # the command name can contain spaces, fields are counted after it
+            fields = f.read().rsplit(')', 1)[1].split()
+
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+
+        start_ticks = float(fields[19])
+        return time.time() - (uptime - start_ticks / os.sysconf('SC_CLK_TCK'))
+    except (IOError, OSError, IndexError, ValueError, AttributeError):
+        return Scope.start
+
+
+def enable():
+    """turns profiling on, spans are only recorded while it is on"""
+
+    Scope.enabled = True
+    Scope.start = get_process_start()
+    Scope.spans = []
+    Scope.units = []
+
+    add_span('python startup', Scope.start, time.time() - Scope.start, 'startup')
+
+
+def is_enabled():
+    return Scope.enabled
+
+
+def add_span(name, start, duration, category='wqt'):
+    """records a span that started at start (epoch seconds) and took duration seconds"""
+
+    if Scope.enabled:
+        Scope.spans.append({'name': name, 'category': category, 'start': start, 'duration': duration})
+
+
+@contextmanager
+def span(name, category='wqt'):
+    """records the time spent in the with block"""
+
+    start = time.time()
+
+    try:
+        yield
+    finally:
+        add_span(name, start, time.time() - start, category)
+
+
+def profiled(func):
+    """decorator that records every call of the function as a span"""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not Scope.enabled:
+            return func(*args, **kwargs)
+
+        with span(func.__name__):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+def get_ninja_log_size(build_path):
+    """returns the size of the ninja log so only entries of the next build are read"""
+
+    try:
+        return os.path.getsize(build_path + '/.ninja_log')
+    except OSError:
+        return 0
+
+
+def add_ninja_log(build_path, offset, build_start):
+    """records the compile time of every output ninja built after offset in its log"""
+
+    if not Scope.enabled or not os.path.exists(build_path + '/.ninja_log'):
+        return
+
+    with open(build_path + '/.ninja_log') as f:
+        f.seek(offset)
+        lines = f.read().splitlines()
+
+    for line in lines:
+        fields = line.split('\t')
+
+        # start and end are milliseconds since ninja started
+        if line.startswith('#') or len(fields) < 4:
+            continue
+
+        start, end = int(fields[0]) / 1000.0, int(fields[1]) / 1000.0
+        Scope.units.append({'output': fields[3], 'start': build_start + start, 'duration': end - start})
+
+
+def __trace_events():
+    """returns the spans as chrome trace events, overlapping compile units are spread over lanes"""
+
+    events = []
+
+    for item in Scope.spans:
+        events.append({'name': item['name'], 'cat': item['category'], 'ph': 'X', 'pid': 1, 'tid': 0,
+                       'ts': int((item['start'] - Scope.start) * 1e6), 'dur': int(item['duration'] * 1e6)})
+
+    lanes = []
+
+    for unit in sorted(Scope.units, key=lambda u: u['start']):
+        lane = 0
+
+        while lane < len(lanes) and lanes[lane] > unit['start']:
+            lane += 1
+
+        if lane == len(lanes):
+            lanes.append(0)
+
+        lanes[lane] = unit['start'] + unit['duration']
+        events.append({'name': unit['output'], 'cat': 'compile', 'ph': 'X', 'pid': 1, 'tid': lane + 1,
+                       'ts': int((unit['start'] - Scope.start) * 1e6), 'dur': int(unit['duration'] * 1e6)})
+
+    return events
+
+
+def write_reports(path, command):
+    """writes the json report and the chrome trace file to the project's wqt folder, returns the phase totals"""
+
+    total = time.time() - Scope.start
+    phases = {}
+
+    for item in Scope.spans:
+        phases[item['name']] = phases.get(item['name'], 0) + item['duration']
+
+    if not os.path.exists(path + '/wqt'):
+        return phases
+
+    report = {
+        'command': command,
+        'total': total,
+        'phases': phases,
+        'spans': [dict(item, start=item['start'] - Scope.start) for item in Scope.spans],
+        'translation_units': sorted([dict(unit, start=unit['start'] - Scope.start) for unit in Scope.units],
+                                    key=lambda u: -u['duration'])
+    }
+
+    with open(path + PROFILE_FILE, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    with open(path + TRACE_FILE, 'w') as f:
+        json.dump({'traceEvents': __trace_events(), 'displayTimeUnit': 'ms'}, f)
+
+    return phases
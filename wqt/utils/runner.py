@@ -0,0 +1,195 @@
+"""@package utils
+Runner starts the build tools, saves their output to wqt/logs and turns it into build events
+"""
+
+import io
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+
+from wqt.utils.output import (
+    emit,
+    get_output_mode
+)
+
+# [12/345] Building CXX object CMakeFiles/app.dir/main.cpp.o
+NINJA_PROGRESS = re.compile(r'^\[(\d+)/(\d+)\] (.*)$')
+# [ 45%] Building CXX object CMakeFiles/app.dir/main.cpp.o
+MAKE_PROGRESS = re.compile(r'^\[\s*(\d+)%\] (.*)$')
+TARGET = re.compile(r'CMakeFiles/([^/]+)\.dir/|[Bb]uilt target (\S+)')
+
+# gcc and clang: file:line:column: severity: message
+GCC_DIAGNOSTIC = re.compile(r'^((?:[A-Za-z]:)?[^:\s][^:]*):(\d+):(?:(\d+):)?\s*'
+                            r'(fatal error|error|warning|note):\s*(.*)$')
+# msvc: file(line,column): severity code: message
+MSVC_DIAGNOSTIC = re.compile(r'^(.+?)\((\d+)(?:,(\d+))?\)\s*:\s*(fatal error|error|warning)\s*\w*\s*:\s*(.*)$')
+# cmake: CMake Error at CMakeLists.txt:12 (find_package):
+CMAKE_DIAGNOSTIC = re.compile(r'^CMake (Error|Warning)(?: \(dev\))? at (.+?):(\d+)')
+
+# width of the bar in progress output mode
+PROGRESS_WIDTH = 30
+
+
+def parse_progress(line):
+    """returns (done, total, description) for a ninja or make progress line, total is 100 for make percentages"""
+
+    match = NINJA_PROGRESS.match(line)
+
+    if match:
+        return int(match.group(1)), int(match.group(2)), match.group(3)
+
+    match = MAKE_PROGRESS.match(line)
+
+    if match:
+        return int(match.group(1)), 100, match.group(2)
+
+    return None
+
+
+def parse_diagnostic(line):
+    """returns a dictionary with file, line, column, severity and message for a compiler or cmake diagnostic"""
+
+    match = GCC_DIAGNOSTIC.match(line) or MSVC_DIAGNOSTIC.match(line)
+
+    if match:
+        return {'file': match.group(1), 'line': int(match.group(2)),
+                'column': int(match.group(3)) if match.group(3) else None,
+                'severity': match.group(4).replace('fatal ', ''), 'message': match.group(5).strip()}
+
+    match = CMAKE_DIAGNOSTIC.match(line)
+
+    if match:
+        return {'file': match.group(2), 'line': int(match.group(3)), 'column': None,
+                'severity': match.group(1).lower(), 'message': line.strip()}
+
+    return None
+
+
+def get_line_width():
+    """returns the width the progress line can use without wrapping"""
+
+    try:
+        from shutil import get_terminal_size
+
+        return get_terminal_size().columns - 1
+    except ImportError:
+        return 79
+
+
+class Scope:
+    """holds the lock that keeps the output of concurrent commands apart"""
+
+    lock = threading.Lock()
+    progress_shown = False
+    line_width = get_line_width()
+
+
+class Command:
+    """a running build tool, its output is read by a thread until it exits"""
+
+    def __init__(self, command, cwd, log_file, phase, config=None, echo=True, env=None):
+        self.phase = phase
+        self.config = config
+        self.echo = echo
+        self.log_file = log_file
+        self.diagnostics = []
+        self.start = time.time()
+
+        if not os.path.exists(os.path.dirname(log_file)):
+            os.makedirs(os.path.dirname(log_file))
+
+        self.log = io.open(log_file, 'wb')
+
+        with Scope.lock:
+            emit('phase_start', phase=phase, config=config, command=command, log=log_file)
+
+        self.process = subprocess.Popen(command, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+        self.reader = threading.Thread(target=self.__read)
+        self.reader.daemon = True
+        self.reader.start()
+
+    def __read(self):
+        """saves every line to the log and shows it in the output mode"""
+
+        mode = get_output_mode()
+
+        for data in iter(self.process.stdout.readline, b''):
+            self.log.write(data)
+            line = data.decode('utf-8', 'replace').rstrip('\r\n')
+
+            with Scope.lock:
+                self.__handle(line, mode)
+
+    def __handle(self, line, mode):
+        progress = parse_progress(line)
+        diagnostic = parse_diagnostic(line)
+
+        if diagnostic is not None:
+            self.diagnostics.append(diagnostic)
+
+        # listeners of the python api get the events in every mode, emit only prints them in json mode
+        if progress is not None:
+            target = TARGET.search(progress[2])
+            emit('progress', phase=self.phase, config=self.config, done=progress[0], total=progress[1],
+                 description=progress[2], target=target and (target.group(1) or target.group(2)))
+        if diagnostic is not None:
+            emit('diagnostic', phase=self.phase, config=self.config, **diagnostic)
+
+        if mode == 'progress':
+            if diagnostic is not None and diagnostic['severity'] in ['error', 'warning']:
+                self.clear_progress()
+                sys.stdout.write(line + '\n')
+            # without a terminal redrawing the line does not work, only diagnostics are shown
+            if progress is not None and self.echo and sys.stdout.isatty():
+                self.__show_progress(progress[0], progress[1], progress[2])
+        elif mode == 'text' and self.echo:
+            sys.stdout.write(line + '\n')
+            sys.stdout.flush()
+
+    def __show_progress(self, done, total, description):
+        """redraws the progress bar line"""
+
+        name = self.phase + (' ' + self.config if self.config else '')
+        filled = PROGRESS_WIDTH * done // max(total, 1)
+        bar = '[' + '=' * filled + ' ' * (PROGRESS_WIDTH - filled) + ']'
+        line = bar + ' ' + '{:3d}'.format(100 * done // max(total, 1)) + '% ' + name + ' ' + description
+
+        sys.stdout.write('\r' + line[:Scope.line_width].ljust(Scope.line_width))
+        sys.stdout.flush()
+        Scope.progress_shown = True
+
+    @staticmethod
+    def clear_progress():
+        if Scope.progress_shown:
+            sys.stdout.write('\r' + ' ' * Scope.line_width + '\r')
+            sys.stdout.flush()
+            Scope.progress_shown = False
+
+    def wait(self):
+        """waits for the command to exit, returns its exit code"""
+
+        code = self.process.wait()
+        self.reader.join()
+        self.process.stdout.close()
+        self.log.close()
+
+        errors = len([item for item in self.diagnostics if item['severity'] == 'error'])
+        warnings = len([item for item in self.diagnostics if item['severity'] == 'warning'])
+
+        with Scope.lock:
+            if get_output_mode() == 'progress':
+                self.clear_progress()
+
+            emit('phase_end', phase=self.phase, config=self.config, code=code, duration=time.time() - self.start,
+                 errors=errors, warnings=warnings, log=self.log_file)
+
+        return code
+
+
+def run(command, cwd, log_file, phase, config=None, echo=True, env=None):
+    """runs the command until it exits and returns its exit code"""
+
+    return Command(command, cwd, log_file, phase, config, echo, env).wait()
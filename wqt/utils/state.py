@@ -0,0 +1,155 @@
+"""@package utils
+State keeps content hashes of generated files and build inputs between runs
+"""
+
+import hashlib
+import json
+import os
+
+from wqt.utils.memoize import memoized
+
+STATE_FILE = '/wqt/state.json'
+
+
+def hash_data(data):
+    """returns the sha1 hash of a string or bytes"""
+
+    if not isinstance(data, bytes):
+        data = data.encode('utf-8')
+
+    return hashlib.sha1(data).hexdigest()
+
+
+def hash_file(path):
+    """returns the sha1 hash of a file's content"""
+
+    with open(path, 'rb') as f:
+        return hash_data(f.read())
+
+
+class State:
+    """Content hashes recorded for a project, stored in wqt/state.json"""
+
+    def __init__(self, path):
+        self.path = path
+        self.dirty = False
+        self.changed = False
+        self.data = {'outputs': {}, 'inputs': {}, 'indexes': {}}
+
+        try:
+            with open(path + STATE_FILE) as f:
+                data = json.load(f)
+
+            self.data['outputs'].update(data.get('outputs', {}))
+            self.data['inputs'].update(data.get('inputs', {}))
+            self.data['indexes'].update(data.get('indexes', {}))
+        except (IOError, OSError, ValueError):
+            # missing or corrupt state only means everything is regenerated
+            pass
+
+    def __key(self, file):
+        return os.path.relpath(file, self.path).replace('\\', '/')
+
+    def __record(self, key, file, digest):
+        stat = os.stat(file)
+        self.data['outputs'][key] = {'hash': digest, 'mtime': stat.st_mtime, 'size': stat.st_size}
+        self.dirty = True
+
+    def __matches(self, key, file, digest):
+        """checks whether the file on disk already has the given content"""
+
+        if not os.path.exists(file):
+            return False
+
+        record = self.data['outputs'].get(key)
+        stat = os.stat(file)
+
+        # trust the recorded hash if the file was not touched since it was recorded
+        if record is not None and record['mtime'] == stat.st_mtime and record['size'] == stat.st_size:
+            return record['hash'] == digest
+
+        if hash_file(file) == digest:
+            self.__record(key, file, digest)
+            return True
+
+        return False
+
+    def write(self, file, data):
+        """writes data to the file only if its content differs, returns True if the file was written"""
+
+        key = self.__key(file)
+        digest = hash_data(data)
+
+        if self.__matches(key, file, digest):
+            return False
+
+        with open(file, 'wb' if isinstance(data, bytes) else 'w') as f:
+            f.write(data)
+
+        self.__record(key, file, digest)
+        self.changed = True
+
+        return True
+
+    def is_current(self, file):
+        """checks if a generated file was not touched since it was recorded"""
+
+        record = self.data['outputs'].get(self.__key(file))
+
+        if record is None or not os.path.exists(file):
+            return False
+
+        stat = os.stat(file)
+        return record['mtime'] == stat.st_mtime and record['size'] == stat.st_size
+
+    def output_hash(self, file):
+        """returns the recorded hash of a generated file or None"""
+
+        record = self.data['outputs'].get(self.__key(file))
+
+        if record is None:
+            return None
+
+        return record['hash']
+
+    def get_input(self, name):
+        """returns the recorded hash of a named input"""
+
+        return self.data['inputs'].get(name)
+
+    def set_input(self, name, digest):
+        """records the hash of a named input"""
+
+        if self.data['inputs'].get(name) != digest:
+            self.data['inputs'][name] = digest
+            self.dirty = True
+
+    def get_index(self, name):
+        """returns a cached index recorded under name, empty if there is none"""
+
+        return self.data['indexes'].get(name, {})
+
+    def set_index(self, name, index):
+        """records a cached index under name"""
+
+        if self.data['indexes'].get(name) != index:
+            self.data['indexes'][name] = index
+            self.dirty = True
+
+    def save(self):
+        """writes the state file if anything was recorded"""
+
+        if not self.dirty or not os.path.exists(self.path + '/wqt'):
+            return
+
+        with open(self.path + STATE_FILE, 'w') as f:
+            json.dump(self.data, f, indent=2, sort_keys=True)
+
+        self.dirty = False
+
+
+@memoized
+def get_state(path):
+    """returns the state of the project at path, loaded once per run"""
+
+    return State(path)
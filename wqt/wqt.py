@@ -5,10 +5,14 @@ Main Script that calls other scripts to make WQt work
 from __future__ import absolute_import
 
 import argparse
+import sys
 
-from wqt.command import creation, handle
-from wqt.templates.files import QType
-from wqt.utils.output import error
+from colorama import Fore
+
+from wqt.utils import profile
+from wqt.utils.errors import WQtError
+from wqt.utils.helper import BUILD_CONFIGS, get_valid_path
+from wqt.utils.output import OUTPUT_MODES, emit, error, set_output_mode, writeln
 
 
 def parse():
@@ -19,23 +23,71 @@ def parse():
     parser.add_argument(
         'action',
         nargs='+',
-        help='action to perform (create, update, build, clean, list-types, add-lib, rm-lib, list_qml, and show_qml')
+        help='action to perform (create, update, configure, build, clean, run, test, open, watch, list-types, '
+             'add-lib, rm-lib, list-libs, list-qml, preview-qml, and cache-stats)')
     parser.add_argument(
         '--path',
         help='path where the project is or will be created'
     )
     parser.add_argument(
         '--generator',
-        help='makefile generator to use for build (default: Unix Makefiles)',
+        help='cmake generator to use for build (default: Ninja if installed, otherwise Unix Makefiles)',
         type=str)
     parser.add_argument(
         '--make',
-        help='path to make binary',
+        help='path to the build tool binary (make or ninja)',
         type=str)
     parser.add_argument(
         '--cmake',
         help='path to cmake binary',
         type=str)
+    parser.add_argument(
+        '--all',
+        help='build every project listed in the wqt-workspace.ini of the project folder or its parents (build)',
+        action='store_true')
+    parser.add_argument(
+        '--config',
+        help='build configuration, built in wqt/build/<config> to bin/<config> (configure, build, run, test, open, '
+             'clean)',
+        choices=BUILD_CONFIGS + ['all'])
+    parser.add_argument(
+        '--no-configure',
+        help='only run the build tool in the build folder wqt configure created (build, test)',
+        action='store_true')
+    parser.add_argument(
+        '--objects',
+        help='only remove object files, keeping the cmake cache and the qt autogen outputs (clean)',
+        action='store_true')
+    parser.add_argument(
+        '--shard',
+        help='run the i-th of n parts of the tests, written as i/n, to split them over several machines (test)',
+        type=str)
+    parser.add_argument(
+        '--report',
+        help='file to write the test results to, json for a .json file and JUnit xml otherwise (test)',
+        type=str)
+    parser.add_argument(
+        '--restart',
+        help='restart the executable after every rebuild (watch)',
+        action='store_true')
+    parser.add_argument(
+        '--output',
+        help='text shows all tool output, progress a progress bar and diagnostics, json one build event per line, '
+             'quiet nothing (default: text)',
+        choices=OUTPUT_MODES,
+        default='text')
+    parser.add_argument(
+        '--profile',
+        help='record the time of every phase and write wqt/profile.json and wqt/trace.json (build, run, update)',
+        action='store_true')
+    parser.add_argument(
+        '-j', '--jobs',
+        help='number of parallel build jobs and tests run at once (default: number of cpus)',
+        type=int)
+    parser.add_argument(
+        '--job-memory',
+        help='megabytes of free memory needed per build job, caps the default number of jobs',
+        type=int)
 
     return parser.parse_args()
 
@@ -47,64 +99,193 @@ def provided(*args):
         return True
 
 
-def verify_qt_application(qt_type):
-    """verifies if the type of Qt application is supported"""
+def report_profile(path, action):
+    """writes the profile reports and shows the time spent in each phase"""
+
+    phases = profile.write_reports(path, action)
 
-    if qt_type is None:
-        error('Invalid Qt application specified')
+    writeln('Profile (seconds):')
+
+    for name in sorted(phases, key=lambda phase: -phases[phase]):
+        writeln('  ' + '{:8.3f}'.format(phases[name]) + '  ' + name)
+
+    writeln('Reports written to wqt' + profile.PROFILE_FILE[len('/wqt'):] + ' and wqt' +
+            profile.TRACE_FILE[len('/wqt'):])
 
 
 def main():
     options = parse()
+    set_output_mode(options.output)
 
     path = None
-    cmake = options.cmake
-    make = options.make
-    generator = options.generator
 
     if provided(options.path):
         path = str(options.path)
 
-    # based on the action call scripts
-    if 'create' in options.action:
-        if len(options.action) < 2:
-            error('Specify a type of Qt application to create')
-
-        qt_type = QType.get_type(options.action[1])
-
-        verify_qt_application(qt_type)
-        creation.create(path, qt_type)
-    elif 'update' in options.action:
-        creation.update(path)
-    elif 'build' in options.action:
-        handle.build(path, generator, cmake, make)
-    elif 'clean' in options.action:
-        handle.clean(path)
-    elif 'list-types' in options.action:
-        handle.list_types()
-    elif 'add-lib' in options.action:
-        if len(options.action) < 2:
-            error('Specify the name of the library to add')
-
-        handle.add_lib(path, options.action[1])
-    elif 'rm-lib' in options.action:
-        if len(options.action) < 2:
-            error('Specify the name of the library to remove')
-
-        handle.rm_lib(path, options.action[1])
-    elif 'run' in options.action:
-        handle.run(path, generator, cmake, make)
-    elif 'open' in options.action:
-        handle.open(path)
-    elif 'list-qml' in options.action:
-        handle.list_qml(path)
-    elif 'list-libs' in options.action:
-        handle.list_libs(path)
-    elif 'preview-qml' in options.action:
-        if len(options.action) < 2:
-            error('Specify the name of the qml file to preview')
-
-        handle.preview_qml(path, options.action[1])
+    # the commands raise their errors, they are shown here and exit with code 2
+    try:
+        if options.profile:
+            profile.enable()
+            profile_path = get_valid_path(path)
+
+        try:
+            dispatch(options, path)
+        finally:
+            if options.profile:
+                report_profile(profile_path, options.action[0])
+    except WQtError as e:
+        emit('error', message=str(e))
+        writeln(e.text, Fore.RED)
+        sys.exit(2)
+
+
+def __create(options, path):
+    from wqt import api
+
+    if len(options.action) < 2:
+        error('Specify a type of Qt application to create')
+
+    api.create(path, options.action[1])
+
+
+def __update(options, path):
+    from wqt import api
+
+    api.update(path)
+
+
+def __configure(options, path):
+    from wqt import api
+
+    api.configure(path, options.generator, options.make, options.cmake, config=options.config)
+
+
+def __build(options, path):
+    from wqt import api
+
+    if options.all:
+        api.build_all(path, options.generator, options.make, options.cmake, options.jobs, options.job_memory,
+                      options.no_configure, options.config)
+        return
+
+    api.build(path, options.generator, options.make, options.cmake, options.jobs, options.job_memory,
+              options.no_configure, options.config)
+
+
+def __clean(options, path):
+    from wqt import api
+
+    api.clean(path, options.objects, options.config)
+
+
+def __list_types(options, path):
+    from wqt.command import handle
+
+    handle.list_types()
+
+
+def __add_lib(options, path):
+    from wqt.command import handle
+
+    if len(options.action) < 2:
+        error('Specify the name of the library to add')
+
+    handle.add_lib(path, options.action[1])
+
+
+def __rm_lib(options, path):
+    from wqt.command import handle
+
+    if len(options.action) < 2:
+        error('Specify the name of the library to remove')
+
+    handle.rm_lib(path, options.action[1])
+
+
+def __run(options, path):
+    from wqt import api
+
+    api.run(path, options.generator, options.make, options.cmake, options.jobs, options.job_memory,
+            options.config)
+
+
+def __test(options, path):
+    from wqt import api
+
+    api.test(path, options.generator, options.make, options.cmake, options.jobs, options.job_memory,
+             options.no_configure, options.config, options.shard, options.report)
+
+
+def __open(options, path):
+    from wqt import api
+
+    api.open(path, options.config)
+
+
+def __list_qml(options, path):
+    from wqt.command import handle
+
+    handle.list_qml(path)
+
+
+def __list_libs(options, path):
+    from wqt.command import handle
+
+    handle.list_libs(path)
+
+
+def __watch(options, path):
+    from wqt.command import watch
+
+    watch.watch(path, options.generator, options.make, options.cmake, options.jobs, options.job_memory,
+                options.restart)
+
+
+def __cache_stats(options, path):
+    from wqt.command import handle
+
+    handle.cache_stats(path)
+
+
+def __preview_qml(options, path):
+    from wqt.command import handle
+
+    if len(options.action) < 2:
+        error('Specify the name of the qml file to preview')
+
+    handle.preview_qml(path, options.action[1])
+
+
+# action name -> handler, command modules are imported by the handler so every action only pays for what it uses
+ACTIONS = {
+    'create': __create,
+    'update': __update,
+    'configure': __configure,
+    'build': __build,
+    'clean': __clean,
+    'list-types': __list_types,
+    'add-lib': __add_lib,
+    'rm-lib': __rm_lib,
+    'run': __run,
+    'test': __test,
+    'open': __open,
+    'list-qml': __list_qml,
+    'list-libs': __list_libs,
+    'watch': __watch,
+    'cache-stats': __cache_stats,
+    'preview-qml': __preview_qml,
+}
+
+
+def dispatch(options, path):
+    """calls the handler of the action"""
+
+    action = options.action[0]
+
+    if action not in ACTIONS:
+        error('Unknown action ' + action + ', use one of: ' + ', '.join(sorted(ACTIONS)))
+
+    ACTIONS[action](options, path)
 
 
 if __name__ == '__main__':